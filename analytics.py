@@ -0,0 +1,117 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from filters import FILTER_COLS, FilterEngine, LRUCache
+from loader import is_week_col
+
+WEEKLY_KEYS = ['College Name', 'Batch No', 'Week', 'Week_Label']
+SUM_COLS = [
+    'Students Count', 'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch',
+    'Intervention Completed', 'Pending Intervention '
+]
+
+
+def week_number(col):
+    # 'Monday' is week 1, 'Monday.1' week 2, ...
+    match = re.search(r'\.(\d+)', str(col))
+    return int(match.group(1)) + 1 if match else 1
+
+
+def build_weekly_long(tracker):
+    """Long table of interventions per tracker row and week, built once per snapshot.
+
+    Each weekday cell with a value > 0 counts as one intervention. `row` is the
+    tracker row position, so any filtered view can be sliced out of this table.
+    """
+    week_cols = [col for col in tracker.columns if is_week_col(col)]
+    if not week_cols:
+        return pd.DataFrame({
+            'row': pd.Series(dtype=np.int32),
+            'College Name': pd.Categorical([]),
+            'Batch No': pd.Series(dtype=float),
+            'Week': pd.Series(dtype=np.int16),
+            'Week_Label': pd.Categorical([]),
+            'Intervention Count': pd.Series(dtype=np.int32),
+        })
+
+    done = tracker[week_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float) > 0
+    weeks = np.array([week_number(col) for col in week_cols])
+    week_ids = np.unique(weeks)
+    # (rows x days) @ (days x weeks) one-hot -> interventions per row per week
+    counts = done.astype(np.int32) @ (weeks[:, None] == week_ids[None, :]).astype(np.int32)
+
+    rows, w = np.nonzero(counts)
+    return pd.DataFrame({
+        'row': rows.astype(np.int32),
+        'College Name': pd.Categorical(tracker['College Name'].to_numpy()[rows]),
+        'Batch No': tracker['Batch No'].to_numpy()[rows],
+        'Week': week_ids[w].astype(np.int16),
+        'Week_Label': pd.Categorical.from_codes(w, [f"Week {n}" for n in week_ids]),
+        'Intervention Count': counts[rows, w],
+    })
+
+
+def weekly_interventions(weekly_long, rows=None):
+    """Interventions per (College, Batch, Week) for the given tracker row positions (None = all)."""
+    if rows is not None:
+        weekly_long = weekly_long[np.isin(weekly_long['row'].to_numpy(), np.asarray(rows))]
+    return (
+        weekly_long.groupby(WEEKLY_KEYS, observed=True)['Intervention Count']
+        .sum()
+        .reset_index()
+    )
+
+
+class AggregateCube:
+    """KPI sums pre-aggregated at (University, College, Trainer, Batch) grain.
+
+    Any Quick Filter combination selects a set of cube cells through a
+    FilterEngine over the cube itself, and the KPIs and per-college totals are
+    rolled up from those cells. Results are memoized per normalized selection.
+    """
+
+    def __init__(self, tracker, cache_size=256):
+        keys = [col for col in FILTER_COLS if col in tracker.columns]
+        sums = [col for col in SUM_COLS if col in tracker.columns]
+        completion = tracker['Completion Percentage']
+        cells = (
+            tracker[keys + sums]
+            .assign(_completion_sum=completion.fillna(0), _completion_n=completion.notna().astype(np.int32))
+            .groupby(keys, observed=True, sort=False, dropna=False)
+            .sum()
+            .reset_index()
+        )
+        self.cells = cells
+        self.engine = FilterEngine(cells, columns=keys, cache_name='aggregate_filters')
+        self._cache = LRUCache(cache_size, name='aggregates')
+
+    def _selected(self, selections):
+        rows = self.engine.rows(selections)
+        return self.cells if rows is None else self.cells.iloc[rows]
+
+    def totals(self, selections):
+        """Summed KPI columns plus 'Completion %' (mean of Completion Percentage × 100, rounded; 0 when unknown)."""
+        def compute():
+            cells = self._selected(selections)
+            totals = {col: cells[col].sum() for col in SUM_COLS if col in cells.columns}
+            n = cells['_completion_n'].sum()
+            totals['Completion %'] = round(cells['_completion_sum'].sum() / n * 100) if n else 0
+            return totals
+
+        return self._cache.get_or_compute(('totals', self.engine.key(selections)), compute)
+
+    def college_status(self, selections, top=10):
+        """Completed/pending interventions for the `top` colleges by total interventions."""
+        def compute():
+            status = (
+                self._selected(selections)
+                .groupby("College Name", observed=True)[["Intervention Completed", "Pending Intervention "]]
+                .sum()
+                .reset_index()
+            )
+            status["Total"] = status["Intervention Completed"] + status["Pending Intervention "]
+            return status.sort_values("Total", ascending=False).head(top)
+
+        return self._cache.get_or_compute(('college_status', top, self.engine.key(selections)), compute)
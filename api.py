@@ -0,0 +1,295 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from analytics import SUM_COLS, AggregateCube, build_weekly_long, weekly_interventions
+from courses import DEFAULT_URL, course_dir, load_courses, start_refresher
+from filters import FilterEngine, LRUCache
+from loader import completion_pct
+from perf import METRICS
+from snapshot_store import to_arrow
+
+logger = logging.getLogger(__name__)
+
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+JSON_MIME = 'application/json'
+# Query parameters selecting Quick Filter values; each may be repeated, e.g. ?college=A&college=B&batch=2
+FILTER_PARAMS = {'university': 'University Code', 'college': 'College Name', 'trainer': 'Trainer name', 'batch': 'Batch No'}
+VIEWS = ['kpis', 'colleges', 'weekly', 'rows']
+# Smaller bodies are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict
+    body: bytes = b''
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SnapshotViews:
+    """Indexes over one snapshot, built by the first request that needs them."""
+
+    def __init__(self, snapshot):
+        self.tracker = snapshot.tracker
+        self.engine = FilterEngine(snapshot.tracker, cache_name='api_filters')
+        self.cube = AggregateCube(snapshot.tracker)
+        weekly_long = (snapshot.derived or {}).get('weekly_long')
+        self.weekly_long = build_weekly_long(snapshot.tracker) if weekly_long is None else weekly_long
+
+
+class TrackerAPI:
+    """Read-only HTTP access to the published snapshots, so other tools need not scrape the dashboard.
+
+    `GET /api/courses` lists the courses and their snapshot; per course,
+    `/api/courses/<key>/kpis` gives the KPI totals, `colleges` the per-college
+    intervention status (`top`), `weekly` the interventions per college, batch
+    and week, and `rows` the cleaned tracker rows (`columns`, `offset`,
+    `limit`). FILTER_PARAMS narrow any of them. Responses are JSON, or an
+    Arrow IPC stream with `format=arrow` or `Accept: application/vnd.apache.arrow.stream`.
+
+    Every response carries an ETag derived from the snapshot's content hash and
+    the request, so a client repeating a request with If-None-Match gets a
+    bodiless 304 until the workbook changes. Bodies are built once per ETag
+    (and gzipped once for clients that accept it) and shared by every client.
+    """
+
+    def __init__(self, refreshers, courses, cache_size=256):
+        self.refreshers = refreshers
+        self.courses = {course.key: course for course in courses}
+        self._views = LRUCache(2 * len(self.courses), name='api_views')
+        self._bodies = LRUCache(cache_size, name='api_bodies')
+
+    def handle(self, target, headers):
+        """Response to a GET of `target` (path and query string) with the request's `headers`."""
+        try:
+            with METRICS.timer('api.request'):
+                return self._handle(target, headers)
+        except ApiError as e:
+            METRICS.count(f'api.status.{e.status}')
+            body = json.dumps({'error': str(e)}).encode()
+            return Response(e.status, {'Content-Type': JSON_MIME, 'Cache-Control': 'no-store'}, body)
+
+    def _handle(self, target, headers):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+
+        if parts == ['api', 'courses']:
+            snapshots = {key: self.refreshers[key].current(timeout=0) for key in self.courses}
+            version = tuple((key, s and s.content_hash, s and s.error) for key, s in snapshots.items())
+            return self._respond(version, 'courses', query, headers, lambda: self._course_list(snapshots))
+
+        if len(parts) != 4 or parts[:2] != ['api', 'courses'] or parts[3] not in VIEWS:
+            raise ApiError(404, f"No such endpoint: {url.path}")
+        key, view = parts[2], parts[3]
+        if key not in self.courses:
+            raise ApiError(404, f"No such course: {key}")
+        snapshot = self.refreshers[key].current(timeout=0)
+        if snapshot is None:
+            raise ApiError(503, "The course's workbook has not been loaded yet")
+
+        def build():
+            views = self._views.get_or_compute(snapshot.content_hash, lambda: SnapshotViews(snapshot))
+            return getattr(self, f'_{view}')(views, query)
+
+        return self._respond(snapshot.content_hash, view, query, headers, build)
+
+    def _respond(self, version, view, query, headers, build):
+        fmt = _format(query, headers)
+        params = sorted((name, tuple(values)) for name, values in query.items() if name != 'format')
+        tag = hashlib.blake2b(repr((version, view, params, fmt)).encode(), digest_size=12).hexdigest()
+        # Weak: the same entity is served gzipped or not
+        etag = f'W/"{tag}"'
+        common = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept, Accept-Encoding'}
+        if isinstance(version, str):
+            common['X-Content-Hash'] = version
+
+        if etag in [t.strip() for t in headers.get('If-None-Match', '').split(',')]:
+            METRICS.count('api.not_modified')
+            return Response(304, common)
+
+        body = self._bodies.get_or_compute((tag, 'identity'), lambda: _encode(build(), fmt, version))
+        response = Response(200, {**common, 'Content-Type': ARROW_MIME if fmt == 'arrow' else JSON_MIME}, body)
+        if 'gzip' in headers.get('Accept-Encoding', '') and len(body) >= GZIP_MIN_BYTES:
+            response.body = self._bodies.get_or_compute((tag, 'gzip'), lambda: gzip.compress(body, compresslevel=6))
+            response.headers['Content-Encoding'] = 'gzip'
+        METRICS.count('api.bytes', len(response.body))
+        return response
+
+    def _course_list(self, snapshots):
+        return pd.DataFrame([
+            {
+                'key': key, 'title': self.courses[key].title, 'content_hash': s and s.content_hash,
+                'loaded_at': s and s.loaded_at, 'rows': s and len(s.tracker), 'error': s and s.error,
+            }
+            for key, s in snapshots.items()
+        ])
+
+    def _kpis(self, views, query):
+        selections, rows = _selected(views.engine, query)
+        if rows is not None and len(rows) == 0:
+            totals = {**{col: 0 for col in SUM_COLS}, 'Completion %': 0}
+        else:
+            totals = views.cube.totals(selections)
+        return pd.DataFrame([{**totals, 'Batches': views.engine.n_rows if rows is None else len(rows)}])
+
+    def _colleges(self, views, query):
+        selections, rows = _selected(views.engine, query)
+        top = _int_param(query, 'top', 10)
+        status = views.cube.college_status(selections, top=top)
+        return status.iloc[:0] if rows is not None and len(rows) == 0 else status
+
+    def _weekly(self, views, query):
+        _selections, rows = _selected(views.engine, query)
+        return weekly_interventions(views.weekly_long, rows)
+
+    def _rows(self, views, query):
+        _selections, rows = _selected(views.engine, query)
+        tracker = views.tracker
+        # Compact snapshots don't store 'Completion %'; it is derived for the rows served
+        derive = 'Completion %' not in tracker.columns
+        columns = [col for col in tracker.columns if col != 'Original_Val'] + (['Completion %'] if derive else [])
+        available = {str(col).strip(): col for col in columns}
+        wanted = [name.strip() for value in query.get('columns', []) for name in value.split(',') if name.strip()]
+        unknown = [name for name in wanted if name not in available]
+        if unknown:
+            raise ApiError(400, f"Unknown columns: {unknown}")
+
+        offset = _int_param(query, 'offset', 0)
+        limit = _int_param(query, 'limit', None)
+        positions = np.arange(len(tracker)) if rows is None else rows
+        frame = tracker.iloc[positions[offset:None if limit is None else offset + limit]]
+        if derive:
+            frame = frame.assign(**{'Completion %': completion_pct(frame)})
+        return frame[[available[name] for name in wanted] if wanted else columns].reset_index(drop=True)
+
+
+def _format(query, headers):
+    fmt = query.get('format', [None])[-1]
+    if fmt is None:
+        fmt = 'arrow' if ARROW_MIME in headers.get('Accept', '') else 'json'
+    if fmt not in ('json', 'arrow'):
+        raise ApiError(400, f"Unknown format: {fmt}")
+    return fmt
+
+
+def _int_param(query, name, default):
+    value = query.get(name, [None])[-1]
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer") from None
+    if number < 0:
+        raise ApiError(400, f"{name} must not be negative")
+    return number
+
+
+def _labels(value):
+    # Batch numbers are floats in the tracker; URLs may spell them '2' or '2.0'
+    if isinstance(value, float) and value.is_integer():
+        return [str(int(value)), str(value)]
+    return [str(value)]
+
+
+def _selected(engine, query):
+    """FilterEngine selections from the query, and the matching row positions (None = every row).
+
+    A filter naming only values that do not exist matches no rows.
+    """
+    selections = {}
+    for param, col in FILTER_PARAMS.items():
+        wanted = query.get(param)
+        if not wanted or col not in engine.columns:
+            continue
+        values = {label: value for value in engine.options(col, {}) for label in _labels(value)}
+        chosen = [values[value] for value in wanted if value in values]
+        if not chosen:
+            return selections, np.empty(0, dtype=np.int32)
+        selections[col] = chosen
+    return selections, engine.rows(selections)
+
+
+def _public(frame):
+    # 'Pending Intervention ' and friends lose their stray trailing spaces
+    return frame.rename(columns=lambda col: str(col).strip())
+
+
+def _encode(frame, fmt, version):
+    frame = _public(frame)
+    if fmt == 'arrow':
+        table = to_arrow(frame)
+        if isinstance(version, str):
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'content_hash': version.encode()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return frame.to_json(orient='records', date_format='iso', force_ascii=False).encode()
+
+
+def serve_api(api, port, host='127.0.0.1'):
+    """Serve `api` on a daemon thread; returns the server."""
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients polling several views reuse one connection
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            response = api.handle(self.path, self.headers)
+            self.send_response(response.status)
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(response.body)))
+            self.end_headers()
+            self.wfile.write(response.body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='api-server', daemon=True).start()
+    return server
+
+
+def main():
+    """Run the API on its own, without Streamlit, configured by the same TRACKER_* variables as the dashboard."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    courses = load_courses(os.environ.get('TRACKER_COURSES'), os.environ.get('TRACKER_XLSX_LINK', DEFAULT_URL))
+    snapshot_dir = os.environ.get('TRACKER_SNAPSHOT_DIR', '.snapshots')
+    interval = int(os.environ.get('TRACKER_REFRESH_SECONDS', '60'))
+    refreshers = {
+        course.key: start_refresher(course, course_dir(snapshot_dir, courses, course.key), interval,
+                                    compact=os.environ.get('TRACKER_COMPACT', '1') == '1',
+                                    incremental=os.environ.get('TRACKER_INCREMENTAL', '1') == '1')
+        for course in courses
+    }
+    host = os.environ.get('TRACKER_API_HOST', '127.0.0.1')
+    port = int(os.environ.get('TRACKER_API_PORT', '8502'))
+    server = serve_api(TrackerAPI(refreshers, courses), port, host=host)
+    logger.info("Serving the tracker API on http://%s:%d/api/courses", host, port)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
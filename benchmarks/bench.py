@@ -0,0 +1,267 @@
+"""Headless benchmarks for the data pipeline and both dashboard pages.
+
+Runs fully offline: a synthetic workbook (or --workbook) is served from a local
+stub server instead of the published link.
+
+    python -m benchmarks.bench --colleges 400 --batches 6 --weeks 12 --save benchmarks/baseline.json
+    python -m benchmarks.bench --colleges 400 --batches 6 --weeks 12 --baseline benchmarks/baseline.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from analytics import AggregateCube, build_weekly_long, weekly_interventions
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import make_workbook
+from charts import college_status_figure, completion_pie_figure, weekly_trend_figure
+from fetcher import WorkbookFetcher
+from filters import FILTER_COLS, FilterEngine
+from loader import clean_tracker, compact_tracker, dashboard_columns, is_week_col, read_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Slower or larger-than-baseline ratios above this (and above the noise floors) count as regressions
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR = 0.005
+# Peak-memory growth below this many MB is ignored the same way
+MEMORY_NOISE_FLOOR = 1.0
+# What dashboard.py imports before it draws anything
+STARTUP_IMPORTS = 'import streamlit, analytics, api, charts, courses, exports, filters, history, loader, paging, perf'
+
+
+def measure(fn, repeat=3):
+    """Median wall time over `repeat` runs, plus peak traced memory of one extra run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'peak_mb': peak / 2**20}
+
+
+# --- Reference implementations of the original inline dashboard code ---
+
+def legacy_read(content):
+    tracker = pd.read_excel(io.BytesIO(content), sheet_name='Intervention Tracker', skiprows=4)
+    summary = pd.read_excel(io.BytesIO(content), sheet_name='Summary')
+    return tracker, summary
+
+
+def legacy_filter(df, selections):
+    temp_df = df.copy()
+    options = {}
+    for col in FILTER_COLS:
+        options[col] = sorted(temp_df[col].unique())
+        if selections.get(col):
+            temp_df = temp_df[temp_df[col].isin(selections[col])]
+    return temp_df.copy(), options
+
+
+def legacy_weekly(filt_df):
+    week_cols = [col for col in filt_df.columns if is_week_col(col)]
+    long_df = filt_df.melt(id_vars=['College Name', 'Batch No'], value_vars=week_cols,
+                           var_name='Day', value_name='Value')
+    long_df['Value'] = pd.to_numeric(long_df['Value'], errors='coerce').fillna(0)
+    long_df['Week'] = long_df['Day'].str.extract(r'\.(\d+)').fillna('0').astype(int) + 1
+    long_df['Week_Label'] = "Week " + long_df['Week'].astype(str)
+    return (long_df[long_df['Value'] > 0]
+            .groupby(['College Name', 'Batch No', 'Week', 'Week_Label'])
+            .size()
+            .reset_index(name='Intervention Count'))
+
+
+def random_selections(engine, count, seed=0):
+    rnd = random.Random(seed)
+    states = []
+    for _ in range(count):
+        selections = {}
+        for col in engine.columns:
+            options = engine.options(col, selections)
+            selections[col] = rnd.sample(options, min(len(options), rnd.choice([0, 0, 1, 2])))
+        states.append(selections)
+    return states
+
+
+# --- Stages ---
+
+def bench_pipeline(content, url, repeat, results):
+    fetcher = WorkbookFetcher(url, revalidate_after=0)
+    results['fetch_cold'] = measure(lambda: WorkbookFetcher(url).fetch(), repeat)
+    fetcher.fetch()
+    results['fetch_revalidate'] = measure(lambda: fetcher.fetch(force=True), repeat)
+
+    results['read_legacy'] = measure(lambda: legacy_read(content), repeat)
+    results['read'] = measure(lambda: read_workbook(content, usecols=dashboard_columns), repeat)
+
+    raw, _, _ = read_workbook(content, usecols=dashboard_columns)
+    results['clean'] = measure(lambda: clean_tracker(raw.copy()), repeat)
+    full = clean_tracker(raw.copy())
+    results['compact'] = measure(lambda: compact_tracker(full), repeat)
+    df = clean_tracker(raw.copy(), derived=False)
+    df, memory = compact_tracker(df)
+    results['compact']['bytes_saved'] = memory['saved']
+
+    engine = FilterEngine(df)
+    states = random_selections(engine, 50)
+    results['filter_legacy'] = measure(lambda: [legacy_filter(full, s) for s in states], repeat)
+    results['filter_engine_build'] = measure(lambda: FilterEngine(df), repeat)
+    # Fresh engine per run (every state is a cache miss), then the warm-cache case
+    results['filter_engine_apply'] = measure(lambda: [e.apply(s) for e in [FilterEngine(df)] for s in states], repeat)
+    results['filter_engine_cached'] = measure(lambda: [engine.apply(s) for s in states], repeat)
+
+    results['weekly_legacy'] = measure(lambda: legacy_weekly(full), repeat)
+    results['weekly_build'] = measure(lambda: build_weekly_long(df), repeat)
+    weekly_long = build_weekly_long(df)
+    results['weekly_slice'] = measure(
+        lambda: [weekly_interventions(weekly_long, engine.rows(s)) for s in states], repeat)
+
+    results['cube_build'] = measure(lambda: AggregateCube(df), repeat)
+    results['cube_rollup'] = measure(
+        lambda: [(c.totals(s), c.college_status(s)) for c in [AggregateCube(df)] for s in states], repeat)
+
+    weekly = weekly_interventions(weekly_long)
+    college, batch = weekly.iloc[0]['College Name'], weekly.iloc[0]['Batch No']
+    trend = weekly[(weekly['College Name'] == college) & (weekly['Batch No'] == batch)].sort_values('Week')
+    cube = AggregateCube(df)
+    totals = cube.totals({})
+
+    def build_charts():
+        figures = [
+            weekly_trend_figure(trend, college, batch),
+            college_status_figure(cube.college_status({})),
+            completion_pie_figure(totals['Intervention Completed'], totals['Pending Intervention ']),
+        ]
+        return [fig.to_json() for fig in figures]
+
+    results['charts'] = measure(build_charts, repeat)
+
+
+def bench_startup(repeat, results):
+    # A fresh interpreter per run, as on a newly started replica; peak memory is not traced across processes
+    command = [sys.executable, '-c', STARTUP_IMPORTS]
+    results['startup_imports'] = measure(lambda: subprocess.run(command, cwd=ROOT, check=True), repeat)
+
+
+def bench_render(url, repeat, results):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    os.environ['TRACKER_XLSX_LINK'] = url
+    os.environ['TRACKER_SNAPSHOT_DIR'] = tempfile.mkdtemp(prefix='tracker-bench-')
+    os.chdir(ROOT)
+    script = os.path.join(ROOT, 'dashboard.py')
+
+    def render(page_clicks):
+        at = AppTest.from_file(script, default_timeout=300)
+        at.run()
+        for _ in range(page_clicks):
+            next(b for b in at.button if 'Academic Report' in b.label).click().run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        return at
+
+    def cold():
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        render(0)
+
+    results['render_cold'] = measure(cold, 1)
+    render(0)
+    results['render_home'] = measure(lambda: render(0), repeat)
+    results['render_report'] = measure(lambda: render(1), repeat)
+
+
+def regressed(now, base, tolerance, floor):
+    return (now / base if base else float('inf')) > 1 + tolerance and now - base > floor
+
+
+def compare(results, baseline, tolerance):
+    """Stages slower, or with a higher peak memory, than `baseline` by more than `tolerance`."""
+    regressions = []
+    print(f"\n{'stage':24} {'baseline':>10} {'now':>10} {'ratio':>7} {'base MB':>9} {'now MB':>9} {'ratio':>7}")
+    for stage, now in results.items():
+        base = baseline.get(stage)
+        if base is None:
+            print(f"{stage:24} {'-':>10} {now['seconds']:>9.4f}s {'':>7} {'-':>9} {now['peak_mb']:>9.2f}")
+            continue
+        slower = regressed(now['seconds'], base['seconds'], tolerance, NOISE_FLOOR)
+        larger = regressed(now['peak_mb'], base['peak_mb'], tolerance, MEMORY_NOISE_FLOOR)
+        flag = '  REGRESSION' if slower or larger else ''
+        time_ratio = now['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        mb_ratio = now['peak_mb'] / base['peak_mb'] if base['peak_mb'] else float('inf')
+        print(f"{stage:24} {base['seconds']:>9.4f}s {now['seconds']:>9.4f}s {time_ratio:>6.2f}x "
+              f"{base['peak_mb']:>9.2f} {now['peak_mb']:>9.2f} {mb_ratio:>6.2f}x{flag}")
+        if slower or larger:
+            regressions.append(stage)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--colleges', type=int, default=50)
+    parser.add_argument('--batches', type=int, default=4)
+    parser.add_argument('--weeks', type=int, default=8)
+    parser.add_argument('--workbook', help='benchmark this XLSX file instead of a synthetic one')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-render', action='store_true', help='skip the AppTest page renders')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against this JSON file; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.workbook:
+        with open(args.workbook, 'rb') as f:
+            content = f.read()
+    else:
+        content = make_workbook(colleges=args.colleges, batches=args.batches, weeks=args.weeks)
+
+    results = {}
+    bench_startup(args.repeat, results)
+    with StubServer(content) as server:
+        bench_pipeline(content, server.url, args.repeat, results)
+        if not args.skip_render:
+            bench_render(server.url, args.repeat, results)
+
+    for stage, result in results.items():
+        print(f"{stage:24} {result['seconds']:>9.4f}s  peak {result['peak_mb']:>8.2f} MB")
+
+    report = {
+        'meta': {
+            'colleges': args.colleges, 'batches': args.batches, 'weeks': args.weeks,
+            'workbook': args.workbook, 'workbook_bytes': len(content),
+            'python': platform.python_version(), 'pandas': pd.__version__,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Local HTTP stand-in for the published workbook link."""
+import hashlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that time out or refuse the body hang up mid-response; that is expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Serves `content` on 127.0.0.1 with an ETag, honouring If-None-Match.
+
+    `delay` sleeps before every response and the first `fail_times` requests get
+    a 503, so fetch behaviour under slow or flaky sources can be exercised.
+    With `trickle` set, the body is sent 1 KiB at a time, `trickle` seconds apart.
+    Use as a context manager; `url` is valid while it is running.
+    """
+
+    def __init__(self, content, delay=0.0, fail_times=0, trickle=0.0):
+        self.content = content
+        self.delay = delay
+        self.trickle = trickle
+        self.fail_times = fail_times
+        self.requests = 0
+        self.not_modified = 0
+        self._server = None
+        self._thread = None
+
+    def set_content(self, content):
+        self.content = content
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/workbook.xlsx"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if stub.fail_times > 0:
+                    stub.fail_times -= 1
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                content = stub.content
+                etag = '"%s"' % hashlib.md5(content).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    stub.not_modified += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                if not stub.trickle:
+                    self.wfile.write(content)
+                    return
+                for start in range(0, len(content), 1024):
+                    self.wfile.write(content[start:start + 1024])
+                    self.wfile.flush()
+                    time.sleep(stub.trickle)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = _Server(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
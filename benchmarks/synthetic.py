@@ -0,0 +1,68 @@
+"""Synthetic Intervention Tracker / Summary workbooks shaped like the published export."""
+import io
+import random
+from datetime import datetime, timedelta
+
+import openpyxl
+
+from loader import TRACKER_HEADER_ROW, WEEKDAYS
+
+HOURS_PER_SESSION = 2.5
+PROGRAM_HOURS = 45
+
+
+def week_columns(weeks):
+    return [day if week == 0 else f"{day}.{week}" for week in range(weeks) for day in WEEKDAYS]
+
+
+def make_workbook(colleges=50, batches=4, weeks=8, universities=10, trainers=30, fill=0.3, seed=0):
+    """XLSX bytes with `colleges` x `batches` tracker rows and `weeks` x 6 weekday columns.
+
+    Like the real sheet, the structural cells are only filled on each college's
+    first row, weekday cells are 1 or blank, and a Grand Total row closes the table.
+    """
+    rnd = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    tracker = wb.create_sheet('Intervention Tracker')
+    for title in ['Academic Session Tracker', 'Naan Mudhalvan', None, None][:TRACKER_HEADER_ROW]:
+        tracker.append([title])
+
+    day_cols = week_columns(weeks)
+    tracker.append(['Sl. No', 'University Code', 'College Name', 'Start Date', 'End Date', 'Timing',
+                    'Students Count', 'Trainer name', 'Batch No'] + day_cols +
+                   ['Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch',
+                    'Intervention Completed', 'Pending Intervention ', 'Completion Percentage'])
+
+    total_sessions = int(PROGRAM_HOURS / HOURS_PER_SESSION)
+    start = datetime(2026, 1, 5)
+    enrolled = 0
+    for college in range(colleges):
+        for batch in range(batches):
+            first = batch == 0
+            days = [1 if rnd.random() < fill else None for _ in day_cols]
+            done = min(sum(1 for d in days if d), total_sessions)
+            students = rnd.randint(20, 60)
+            enrolled += students
+            tracker.append(
+                [college + 1 if first else None,
+                 f"unm{1000 + college % universities}" if first else None,
+                 f"College {college:04d}, Chennai" if first else None,
+                 start if first else None,
+                 start + timedelta(weeks=weeks) if first else None,
+                 '9-11.30am',
+                 students,
+                 f"Trainer {rnd.randrange(trainers):03d}",
+                 batch + 1]
+                + days
+                + [done * HOURS_PER_SESSION, PROGRAM_HOURS - done * HOURS_PER_SESSION,
+                   done, total_sessions - done, done / total_sessions]
+            )
+    tracker.append([None, None, 'Grand Total'])
+
+    summary = wb.create_sheet('Summary')
+    summary.append(['Category', 'Enrolled Count', 'Completed Count', 'In Progress', 'Not Started'])
+    summary.append(['Total Count', enrolled, 0, enrolled - 26, 26])
+
+    sink = io.BytesIO()
+    wb.save(sink)
+    return sink.getvalue()
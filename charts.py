@@ -0,0 +1,124 @@
+from perf import LazyModule
+
+# Imported by the first chart drawn, after the header, filters and KPIs are on screen
+px = LazyModule('plotly.express')
+
+
+def weekly_trend_figure(trend_df, college, batch):
+    # Plot trend with Week labels
+    fig = px.line(
+        trend_df,
+        x='Week_Label',
+        y='Intervention Count',
+        markers=True,
+        title=f"📈 {college} (Batch {int(batch)})",
+    )
+
+    fig.update_traces(
+        line=dict(width=1.5, color="black"),
+        marker=dict(size=9, color="#FF8C00"),
+        hovertemplate="<b>%{x}</b><br>Interventions: %{y}<extra></extra>"
+    )
+
+    fig.update_layout(
+        title_x=0.3,
+        font=dict(size=14),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis_title="Week",
+        yaxis_title="Intervention Count",
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False, rangemode="tozero"),
+        margin=dict(l=40, r=40, t=60, b=40),
+    )
+
+    # Force Y-axis to show only integers
+    fig.update_yaxes(dtick=1)
+    return fig
+
+
+def college_status_figure(college_status):
+    fig = px.bar(
+        college_status,
+        y="College Name",
+        x=["Intervention Completed", "Pending Intervention "],
+        orientation="h",
+        title="College-wise Intervention Status",
+        labels={"value": "Intervention Count", "variable": "Status"},
+        color_discrete_map={
+            "Intervention Completed": "#28A745",
+            "Pending Intervention ": "#E74C3C"
+        }
+    )
+
+    fig.update_layout(
+        barmode="stack",
+        xaxis_title="Intervention Count",
+        yaxis_title="College Name",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False),
+        title_x=0.0
+    )
+    return fig
+
+
+def completion_pie_figure(comp, pend):
+    fig_pie = px.pie(values=[comp, pend], names=['Done', 'Pending'], title="Completion Percentage (%)",
+                     color=['Done', 'Pending'], color_discrete_map={'Done': '#28A745', 'Pending': '#E74C3C'})
+    fig_pie.update_traces(
+        texttemplate='%{percent:.0%}',   # rounds 33.5% → 34%
+        hovertemplate='%{label}: %{value} (%{percent:.0%})'
+    )
+    fig_pie.update_layout(title_x=0.0)
+    return fig_pie
+
+
+def course_overview_figure(overview):
+    fig = px.bar(
+        overview,
+        y="Course",
+        x=["Intervention Completed", "Pending Intervention"],
+        orientation="h",
+        title="Course-wise Intervention Status",
+        labels={"value": "Intervention Count", "variable": "Status"},
+        color_discrete_map={
+            "Intervention Completed": "#28A745",
+            "Pending Intervention": "#E74C3C"
+        }
+    )
+
+    fig.update_layout(
+        barmode="stack",
+        xaxis_title="Intervention Count",
+        yaxis_title="Course",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False),
+        title_x=0.0
+    )
+    return fig
+
+
+def history_figure(trend, metrics, title):
+    fig = px.line(
+        trend,
+        x="Loaded At",
+        y=metrics,
+        markers=True,
+        title=title,
+        labels={"value": "Value", "variable": "Metric"},
+    )
+
+    fig.update_layout(
+        title_x=0.0,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        xaxis_title="Snapshot",
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False, rangemode="tozero"),
+        legend_title_text="",
+    )
+    return fig
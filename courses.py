@@ -0,0 +1,144 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+
+import pandas as pd
+
+from fetcher import WorkbookFetcher
+from incremental import IncrementalLoader
+from loader import load_workbook, read_workbook
+from perf import METRICS
+from refresher import SnapshotRefresher
+from snapshot_store import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+# The published workbook served when neither TRACKER_XLSX_LINK nor TRACKER_COURSES is set
+DEFAULT_URL = "https://sheet.zohopublic.in/sheet/published/ydgt683ffbc94742d42859985572cd73c80c7?download=xlsx"
+DEFAULT_TITLE = "Data Analytics & Visualization"
+DEFAULT_DURATION = "45 Hrs"
+# Seconds a pooled parse may take before its worker is presumed stuck
+PARSE_TIMEOUT = 120
+OVERVIEW_COLS = [
+    'Course', 'Enrolled Count', 'Completed Count', 'In Progress', 'Not Started', 'Colleges', 'Batches',
+    'Students', 'Intervention Completed', 'Pending Intervention', 'Completion %', 'Status'
+]
+
+
+@dataclass(frozen=True)
+class Course:
+    """One course workbook: `key` is used in URLs and snapshot paths, `title` in the header."""
+    key: str
+    title: str
+    url: str
+    duration: str = DEFAULT_DURATION
+
+
+def load_courses(config, default_url):
+    """Courses from `config` (a path to a JSON file, or inline JSON), else one default course.
+
+    The JSON is a list of objects with `key`, `title`, `url` and optionally
+    `duration`, e.g. `[{"key": "dav", "title": "Data Analytics & Visualization", "url": "https://..."}]`.
+    """
+    if not config:
+        return [Course('default', DEFAULT_TITLE, default_url)]
+    if os.path.exists(config):
+        with open(config, encoding='utf-8') as f:
+            entries = json.load(f)
+    else:
+        entries = json.loads(config)
+
+    courses = [Course(**entry) for entry in entries]
+    keys = [course.key for course in courses]
+    if not courses or len(set(keys)) != len(keys):
+        raise ValueError(f"Course list must be non-empty with unique keys, got {keys}")
+    return courses
+
+
+def course_dir(snapshot_dir, courses, key):
+    """Snapshot directory of one course; a single course keeps the top-level directory."""
+    return snapshot_dir if len(courses) == 1 else os.path.join(snapshot_dir, key)
+
+
+def start_refresher(course, directory, interval, compact=True, incremental=True, reader=read_workbook,
+                    history=None):
+    """Started SnapshotRefresher for `course`, persisting its snapshots under `directory`."""
+    fetcher = WorkbookFetcher(course.url, revalidate_after=interval)
+    if incremental:
+        loader = IncrementalLoader(compact=compact, reader=reader)
+    else:
+        loader = partial(load_workbook, compact=compact, reader=reader)
+    return SnapshotRefresher(fetcher, interval=interval, loader=loader, store=SnapshotStore(directory),
+                             history=history).start()
+
+
+def parse_pool(workers):
+    """ProcessPoolExecutor for pooled_reader(), or None where there is no forkserver.
+
+    Workers are forked from a forkserver: a fresh single-threaded process with
+    `loader` preloaded. Forking the server itself, with its Streamlit and
+    refresher threads running, could hand a child a lock held mid-fork.
+    """
+    if workers <= 0 or 'forkserver' not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['loader'])
+    return ProcessPoolExecutor(workers, mp_context=context)
+
+
+def pooled_reader(pool, timeout=PARSE_TIMEOUT):
+    """read_workbook() run on `pool` (a ProcessPoolExecutor), so the parses of several courses overlap.
+
+    Falls back to parsing in the calling thread if the pool has broken, or if a
+    parse takes longer than `timeout` seconds; after a timeout the pool is
+    presumed stuck and every later parse stays in-thread.
+    """
+    stuck = threading.Event()
+
+    def read(content, usecols=None):
+        if not stuck.is_set():
+            try:
+                return pool.submit(read_workbook, content, usecols=usecols).result(timeout=timeout)
+            except BrokenProcessPool as e:
+                logger.warning("Parse pool unavailable, parsing in-process: %s", e)
+            except FutureTimeout:
+                stuck.set()
+                METRICS.count('parse.pool_timeout')
+                logger.error("Pooled parse took over %ss; parsing in-process from now on", timeout)
+        return read_workbook(content, usecols=usecols)
+    return read
+
+
+def course_overview(entries):
+    """Cross-course table from `(course, snapshot, totals)` entries; `snapshot` is None while loading.
+
+    `totals` are a course's unfiltered AggregateCube totals; enrolment counts come
+    from the first row of its Summary sheet.
+    """
+    rows = []
+    for course, snapshot, totals in entries:
+        row = {'Course': course.title}
+        if snapshot is None:
+            rows.append({**row, 'Status': 'Loading'})
+            continue
+        summary = snapshot.summary.iloc[0] if len(snapshot.summary) else {}
+        for col in ['Enrolled Count', 'Completed Count', 'In Progress', 'Not Started']:
+            row[col] = summary.get(col)
+        row.update({
+            'Colleges': snapshot.tracker['College Name'].nunique(),
+            'Batches': len(snapshot.tracker),
+            'Students': totals.get('Students Count'),
+            'Intervention Completed': totals.get('Intervention Completed'),
+            'Pending Intervention': totals.get('Pending Intervention '),
+            'Completion %': totals.get('Completion %'),
+            'Status': 'Stale' if snapshot.error else 'OK',
+        })
+        rows.append(row)
+    return pd.DataFrame(rows, columns=OVERVIEW_COLS)
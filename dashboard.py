@@ -1,9 +1,28 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import requests
 import io
+import json
+import os
+import time
+import numpy as np
+from importlib.machinery import ModuleSpec
+from PIL import Image
+
+from analytics import AggregateCube, build_weekly_long, weekly_interventions
+from api import TrackerAPI, serve_api
+from charts import college_status_figure, completion_pie_figure, course_overview_figure, history_figure, weekly_trend_figure
+from courses import DEFAULT_URL, course_dir, course_overview, load_courses, parse_pool, pooled_reader, start_refresher
+from exports import FORMATS, lazy_export
+from filters import FilterEngine, LRUCache
+from history import HISTORY_FILE, HistoryStore
+from loader import CHECKS, NAME_COLS, completion_pct, is_week_col, read_workbook
+from paging import TablePager
+from perf import METRICS, process_started_at, serve_metrics
+
+# Streamlit installs this script as a spec-less __main__, which parse-pool workers would re-run
+# on start-up; multiprocessing skips re-importing a main module whose spec is named __main__
+__spec__ = ModuleSpec("__main__", None)
+
+run_start = time.perf_counter()
 
 # 1. PAGE CONFIGURATION
 st.set_page_config(page_title="Naan Mudhalvan Dashboard", layout="wide")
@@ -65,6 +84,14 @@ st.markdown("""
         border: none;
         box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
     }
+    div.stPopover > div > button {
+        background-color: #28A745;
+        color: white;
+        border-radius: 8px;
+        height: 3.5em;
+        font-weight: 600;
+        border: none;
+    }
     div.stDownloadButton > button:hover {
         background-color: #28A745;  /* Dark green */
         color: white !important;    /* Black text */
@@ -79,54 +106,323 @@ def modern_card(label, value, border_style="border-blue"):
     return st.markdown(card_html, unsafe_allow_html=True)
 
 # 2. DATA ENGINE
-XLSX_LINK = "https://sheet.zohopublic.in/sheet/published/ydgt683ffbc94742d42859985572cd73c80c7?download=xlsx"
+XLSX_LINK = os.environ.get("TRACKER_XLSX_LINK", DEFAULT_URL)
+# Optional course list: a JSON file path or inline JSON (see courses.load_courses);
+# without it the dashboard serves the single course published at TRACKER_XLSX_LINK
+COURSES = load_courses(os.environ.get("TRACKER_COURSES"), XLSX_LINK)
+COURSE_BY_KEY = {course.key: course for course in COURSES}
+# Worker processes for workbook parsing; by default one per course (capped at the CPU count) when there are several
+PARSE_WORKERS = int(os.environ.get(
+    "TRACKER_PARSE_WORKERS", str(min(len(COURSES), os.cpu_count() or 1) if len(COURSES) > 1 else 0)))
+# Seconds between background refreshes of the published workbook
+REFRESH_SECONDS = int(os.environ.get("TRACKER_REFRESH_SECONDS", "60"))
+# Where cleaned snapshots are persisted for warm starts
+SNAPSHOT_DIR = os.environ.get("TRACKER_SNAPSHOT_DIR", ".snapshots")
+# Compact mode: categorical/downcast columns, derived columns computed on demand
+COMPACT = os.environ.get("TRACKER_COMPACT", "1") == "1"
+# Incremental mode: re-clean only the colleges whose rows changed since the last load
+INCREMENTAL = os.environ.get("TRACKER_INCREMENTAL", "1") == "1"
+# Progress history: every distinct workbook version is recorded next to the course's snapshots
+HISTORY = os.environ.get("TRACKER_HISTORY", "1") == "1"
+# How long a cold-started session waits for the very first snapshot
+FIRST_LOAD_TIMEOUT = 120
+# Optional port for the /metrics endpoint (needs TRACKER_METRICS=1 to collect anything)
+METRICS_PORT = os.environ.get("TRACKER_METRICS_PORT")
+# Optional port (and interface) for the read-only JSON/Arrow API over the same snapshots (see api.py)
+API_PORT = os.environ.get("TRACKER_API_PORT")
+API_HOST = os.environ.get("TRACKER_API_HOST", "127.0.0.1")
+
+@st.cache_resource
+def start_metrics_server():
+    return serve_metrics(int(METRICS_PORT)) if METRICS_PORT else None
+
+start_metrics_server()
+
+@st.cache_resource
+def get_parse_pool():
+    # Shared by every course; without a forkserver the parses stay in-thread
+    return parse_pool(PARSE_WORKERS)
+
+@st.cache_resource
+def get_history(course_key):
+    return HistoryStore(os.path.join(course_dir(SNAPSHOT_DIR, COURSES, course_key), HISTORY_FILE)) if HISTORY else None
+
+@st.cache_resource
+def get_refreshers():
+    # One refresher thread per course, so all workbooks are fetched concurrently and
+    # their parses overlap on the process pool; every session reads the published snapshots
+    pool = get_parse_pool()
+    reader = pooled_reader(pool) if pool else read_workbook
+    return {
+        course.key: start_refresher(course, course_dir(SNAPSHOT_DIR, COURSES, course.key), REFRESH_SECONDS,
+                                    compact=COMPACT, incremental=INCREMENTAL, reader=reader,
+                                    history=get_history(course.key))
+        for course in COURSES
+    }
+
+@st.cache_resource
+def start_api_server():
+    return serve_api(TrackerAPI(get_refreshers(), COURSES), int(API_PORT), host=API_HOST) if API_PORT else None
+
+start_api_server()
+
+if 'course' not in st.session_state:
+    # ?course=<key> opens a specific course
+    st.session_state.course = st.query_params.get("course") if st.query_params.get("course") in COURSE_BY_KEY else COURSES[0].key
+course = COURSE_BY_KEY[st.session_state.course]
+
+def get_refresher():
+    return get_refreshers()[course.key]
 
-@st.cache_data(ttl=1)
 def load_and_clean_data():
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    response = requests.get(XLSX_LINK, headers=headers)
-    response.raise_for_status() 
-    excel_file = io.BytesIO(response.content)
-    
-    tracker = pd.read_excel(excel_file, sheet_name='Intervention Tracker', skiprows=4)
-    summary = pd.read_excel(excel_file, sheet_name='Summary')
+    refresher = get_refresher()
+    snapshot = refresher.current(timeout=FIRST_LOAD_TIMEOUT)
+    if snapshot is None:
+        raise RuntimeError(refresher.last_error or "Timed out waiting for the first data load")
+    return snapshot
+
+@st.cache_resource(max_entries=2 * len(COURSES))
+def get_weekly_long(content_hash, _tracker):
+    # Wide → long weekday melt, done once per snapshot and shared by all sessions
+    return build_weekly_long(_tracker)
+
+@st.cache_resource(max_entries=2 * len(COURSES))
+def get_filter_engine(content_hash, _tracker):
+    return FilterEngine(_tracker)
+
+@st.cache_resource(max_entries=2 * len(COURSES))
+def get_aggregate_cube(content_hash, _tracker):
+    return AggregateCube(_tracker)
+
+@st.cache_resource(max_entries=2 * len(COURSES))
+def get_table_pager(content_hash, _tracker):
+    return TablePager(_tracker)
+
+@st.cache_resource
+def get_figure_cache():
+    # Built Plotly figures shared by all sessions; Streamlit serializes a ready Figure
+    # without re-validating it, so revisiting a chart skips the Plotly Express build
+    return LRUCache(maxsize=256, name='figures')
+
+def cached_figure(chart, key, build):
+    # Figures are shared across sessions: treat them as read-only
+    return get_figure_cache().get_or_compute((snapshot.content_hash, chart, key), build)
+
+@st.cache_resource
+def get_export_cache():
+    # Generated download files, shared by all sessions and keyed by snapshot + view state
+    return LRUCache(maxsize=32, name='exports')
+
+def download_menu(file_stem, sheets, view_key):
+    # Each format is only generated when its button is clicked (sheets is a callable)
+    with st.popover("Download", use_container_width=True):
+        for fmt, (ext, mime, label) in FORMATS.items():
+            st.download_button(
+                label,
+                data=lazy_export(get_export_cache(), (snapshot.content_hash, file_stem, view_key), sheets, fmt),
+                file_name=f"{file_stem}.{ext}",
+                mime=mime,
+                key=f"download_{file_stem}_{fmt}",
+                on_click="ignore",
+                use_container_width=True
+            )
 
-    structural_cols = ['University Code', 'College Name', 'Trainer name', 'Batch No', 'Start Date', 'End Date', 'Timing']
-    existing_struct = [c for c in structural_cols if c in tracker.columns]
-    tracker[existing_struct] = tracker[existing_struct].ffill()
+def weekly_interventions_for(view_df):
+    with METRICS.timer("page.weekly"):
+        return weekly_interventions(weekly_long, None if view_df is df else view_df.index)
+
+REPORT_COLS = ['University Code', 'College Name', 'Trainer name', 'Batch No', 'Students Count',
+               'Intervention Completed', 'Pending Intervention ',
+               'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch']
+# Formatting is applied by the browser grid, not a pandas Styler
+REPORT_COLUMN_CONFIG = {
+    'Completion %': st.column_config.NumberColumn(format="%d%%"),
+    'Batch Wise Weekly Hours Completed': st.column_config.NumberColumn(format="%.1f"),
+    'Pending Hours Per Batch': st.column_config.NumberColumn(format="%.1f"),
+    'Batch No': st.column_config.NumberColumn(format="%.2f"),
+}
+REPORT_PAGE_SIZES = [25, 50, 100, 250]
+
+def report_frame(view_df):
+    # 'Completion %' is derived for the given rows only; the shared snapshot doesn't store it
+    return view_df[REPORT_COLS].assign(**{'Completion %': completion_pct(view_df)})
+
+# Chart-local selectors live in fragments: changing them reruns only their own section.
+# Inputs come in as arguments, fixed at the last full run (any Quick Filter change is one).
+@st.fragment
+def weekly_trend_section(weekly_df, view_key):
+    if weekly_df.empty:
+        st.warning("No intervention data available for selected filters.")
+        return
+
+    # 🔽 Horizontal filters (College | Batch)
+    col_f1, col_f2 = st.columns(2)
+
+    with col_f1:
+        college_list = sorted(weekly_df['College Name'].unique())
+        selected_college = st.selectbox(
+        "Select College",
+        college_list,
+        key="weekly_trend_college"
+        )
 
-    tracker = tracker[~tracker['College Name'].astype(str).str.contains('Total|Grand', case=False, na=False)]
-    
-    cols_to_fix = [
-        'Students Count', 'Intervention Completed', 'Pending Intervention ',
-        'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch', 'Batch No'
-    ]
-    
-    for col in cols_to_fix:
-        if col in tracker.columns:
-            tracker[col] = pd.to_numeric(tracker[col], errors='coerce').fillna(0)
-            if 'Hours' not in col and 'Percentage' not in col and 'Batch No' not in col:
-                tracker[col] = tracker[col].astype(int)
-
-    for col in ['University Code', 'College Name', 'Trainer name']:
-        if col in tracker.columns:
-            tracker[col] = tracker[col].astype(str).replace('nan', 'Unknown')
-
-    tracker['Completion Percentage'] = pd.to_numeric(tracker['Completion Percentage'], errors='coerce')  
-    tracker['Original_Val'] = tracker['Completion Percentage'] 
-    tracker['Completion %'] = (tracker['Original_Val'] * 100).fillna(0).astype(int)
-    
-    return tracker, summary
+    with col_f2:
+        batch_list = sorted(
+        weekly_df[
+        weekly_df['College Name'] == selected_college
+        ]['Batch No'].unique()
+        )
 
-try:
-    df, summary_df = load_and_clean_data()
-except Exception as e:
-    st.error(f"Error loading data: {e}")
-    st.stop()
+        selected_batch = st.selectbox(
+        "Select Batch No",
+        batch_list,
+        key="weekly_trend_batch"
+        )
+    trend_df = weekly_df[
+        (weekly_df['College Name'] == selected_college) &
+        (weekly_df['Batch No'] == selected_batch)
+    ].sort_values("Week")
+
+    with METRICS.timer("page.chart.weekly_trend"):
+        fig = cached_figure(
+            "weekly_trend", (view_key, selected_college, selected_batch),
+            lambda: weekly_trend_figure(trend_df, selected_college, selected_batch)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def report_table_section(tracker, engine, pager, rows):
+    # Search, sort and paging run on the server over row positions; only the visible page is sent
+    c1, c2, c3, c4, c5 = st.columns([3, 2, 1, 1, 1])
+    with c1:
+        search = st.text_input("Search", placeholder="College, trainer or university code",
+                               key=f"report_search_{st.session_state.reset_counter}")
+    with c2:
+        sort_col = st.selectbox("Sort by", ["Sheet order"] + REPORT_COLS + ['Completion %'], key="report_sort")
+    with c3:
+        direction = st.selectbox("Order", ["Ascending", "Descending"], key="report_order")
+    with c4:
+        page_size = st.selectbox("Rows per page", REPORT_PAGE_SIZES, key="report_page_size")
+
+    if search.strip():
+        # Names only: Batch No values read '1.0', so '0' or '.0' would match every row
+        matched = engine.search(search, columns=NAME_COLS)
+        rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+    column = None if sort_col == "Sheet order" else "Completion Percentage" if sort_col == "Completion %" else sort_col
+    ordered = pager.order(rows, column, ascending=direction == "Ascending")
+
+    pages = max(1, -(-len(ordered) // page_size))
+    if st.session_state.get("report_page", 1) > pages:
+        st.session_state.report_page = pages
+    with c5:
+        number = st.number_input("Page", min_value=1, max_value=pages, step=1, key="report_page")
+    page_rows, pages = pager.page(ordered, number, page_size)
+
+    if len(ordered) == 0:
+        st.warning("No rows match the search.")
+        return
+    with METRICS.timer("page.report_table"):
+        st.dataframe(report_frame(tracker.iloc[page_rows]), column_config=REPORT_COLUMN_CONFIG,
+                     use_container_width=True, hide_index=True)
+    first = (number - 1) * page_size
+    st.caption(f"Rows {first + 1:,}–{first + len(page_rows):,} of {len(ordered):,} · page {number} of {pages}")
+
+@st.fragment
+def history_section(history):
+    versions = history.versions()
+    if versions.empty:
+        st.info("No workbook versions recorded yet; the history grows with every refresh that brings changes.")
+        return
+
+    c1, c2 = st.columns([1, 3])
+    with c1:
+        kind = st.radio("Trend by", ["College", "Trainer"], horizontal=True, key="history_kind")
+    with c2:
+        names = history.names(kind.lower())
+        name = st.selectbox(f"Select {kind}", ["All (course total)"] + names, key=f"history_{kind.lower()}")
+
+    with METRICS.timer("page.history"):
+        trend = versions if name == "All (course total)" else history.trend(kind.lower(), name)
+    st.caption(f"{len(versions):,} recorded versions · {versions['Loaded At'].iloc[0]:%d %b %Y} – "
+               f"{versions['Loaded At'].iloc[-1]:%d %b %Y}")
+
+    h1, h2 = st.columns(2)
+    with h1:
+        st.plotly_chart(history_figure(trend, ["Completion %"], f"Completion % · {name}"), use_container_width=True)
+    with h2:
+        st.plotly_chart(history_figure(trend, ["Intervention Completed", "Pending Intervention", "Pending Hours"],
+                                       f"Interventions & Pending Hours · {name}"), use_container_width=True)
+    st.dataframe(trend.iloc[::-1], use_container_width=True, hide_index=True)
+
+@st.fragment
+def weekly_table_section(weekly_df, view_key):
+    # The heading row is inside the fragment so the download menu can follow the table's selectors
+    h3, h4 = st.columns([4, 1])
+    with h3:
+        st.markdown("### 📈 Weekly Intervention Completed")
+
+    if weekly_df is None:
+        st.warning("No weekday columns found for weekly calculation.")
+        return
+    if weekly_df.empty:
+        st.warning("No weekly intervention data available.")
+        return
+
+    # 🔽 College + Batch filter for Weekly Intervention Completed Table
+    college_list = sorted(weekly_df['College Name'].unique())
+    col1, col2 = st.columns(2)
+
+    with col1:
+        selected_college_table = st.selectbox(
+            "Select College for Weekly Table",
+            ["All Colleges"] + college_list,
+            key="weekly_table_college"
+        )
+
+    # Filter batch list based on college selection
+    if selected_college_table != "All Colleges":
+        batch_list = sorted(
+            weekly_df[
+                weekly_df['College Name'] == selected_college_table
+            ]['Batch No'].dropna().unique()
+        )
+    else:
+        batch_list = sorted(weekly_df['Batch No'].dropna().unique())
+
+    with col2:
+        selected_batch_table = st.selectbox(
+            "Select Batch for Weekly Table",
+            ["All Batches"] + [str(b) for b in batch_list],
+            key="weekly_table_batch"
+        )
+
+    # Apply filters
+    table_df = weekly_df
+    if selected_college_table != "All Colleges":
+        table_df = table_df[table_df['College Name'] == selected_college_table]
+
+    if selected_batch_table != "All Batches":
+        table_df = table_df[table_df['Batch No'].astype(str) == selected_batch_table]
+    # -------------------
+    # Move the download button to the heading row's right column
+    table_df = table_df.sort_values(['College Name', 'Week_Label'])
+    with h4:
+        download_menu(
+            "Weekly_Intervention_Report",
+            lambda: {"Weekly Interventions": table_df},
+            (view_key, selected_college_table, selected_batch_table)
+        )
+    # Display table
+    st.dataframe(
+        table_df,
+        use_container_width=True,
+        hide_index=True
+    )
 
 # 3. PAGE STATE & RESET LOGIC
 if 'page' not in st.session_state: 
-    st.session_state.page = "Home"
+    # Hidden admin view: open the dashboard with ?admin=1
+    st.session_state.page = "Admin" if st.query_params.get("admin") == "1" else "Home"
 
 if 'reset_counter' not in st.session_state:
     st.session_state.reset_counter = 0
@@ -135,9 +431,19 @@ def reset_filters():
     st.session_state.reset_counter += 1
     # st.rerun() is optional here as the state change triggers a refresh
 
+@st.cache_resource
+def get_logo(path, width=480):
+    # Decoded and shrunk once per process. Given the file path, st.image would decode, resize
+    # and re-encode the full-size PNG on every run of every session (~60 ms for HL_Logo.png)
+    with Image.open(path) as image:
+        image.thumbnail((width, width))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
 # 4. MAIN INTERFACE HEADER
 head_left, head_center, head_right = st.columns([1, 4, 1])
-with head_left: st.image("NM_Logo.png", use_container_width=True)
+with head_left: st.image(get_logo("NM_Logo.png"), use_container_width=True)
 with head_center:
     st.markdown("""
         <div style='text-align: center;'>
@@ -146,18 +452,49 @@ with head_center:
             <p style='color: #666; font-size: 16px; margin-top: 5px;'>Government of Tamil Nadu</p>
             <p style='font-size: 20px; margin-top: 20px;'>
                 <span style='color: #E74C3C; font-weight: bold;'>Course Name:</span> 
-                <span style='color: #000000; font-weight: bold;'>Data Analytics & Visualization</span>
+                <span style='color: #000000; font-weight: bold;'>{course.title}</span>
             </p>
         </div>
-        """, unsafe_allow_html=True)
-with head_right: st.image("HL_Logo.png", use_container_width=True)
+        """.format(course=course), unsafe_allow_html=True)
+    if len(COURSES) > 1:
+        st.selectbox("Course", list(COURSE_BY_KEY), format_func=lambda key: COURSE_BY_KEY[key].title,
+                     key="course", on_change=reset_filters, label_visibility="collapsed")
+with head_right: st.image(get_logo("HL_Logo.png"), use_container_width=True)
 
 st.markdown("<hr style='border: 1.5px solid #1A3C6D; margin-top: 0;'>", unsafe_allow_html=True)
 
+# The header is already on screen while a cold start waits for its first snapshot
+try:
+    snapshot = load_and_clean_data()
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    st.stop()
+
+df, summary_df = snapshot.tracker, snapshot.summary
+if snapshot.error:
+    st.warning(f"Showing data from {int(snapshot.age // 60)} min ago — the latest refresh failed: {snapshot.error}")
+
+week_cols = [col for col in df.columns if is_week_col(col)]
+
+# Incremental loads hand over an already patched table; warm starts and full loads build it here
+weekly_long = (snapshot.derived or {}).get("weekly_long")
+if weekly_long is None:
+    weekly_long = get_weekly_long(snapshot.content_hash, df)
+
 # --- NAVIGATION ---
 nav_col1, nav_spacer, nav_col2 = st.columns([1, 4, 1])
 with nav_col1:
     if st.button("🏠 Home", use_container_width=True): st.session_state.page = "Home"
+with nav_spacer:
+    # Centered secondary pages; All Courses only when several courses are configured
+    extra_pages = {"🌐 All Courses": "All Courses"} if len(COURSES) > 1 else {}
+    if HISTORY:
+        extra_pages["📈 Progress History"] = "Progress History"
+    if extra_pages:
+        nav_mid = st.columns([1] + [1] * len(extra_pages) + [1])
+        for nav_cell, (label, page) in zip(nav_mid[1:-1], extra_pages.items()):
+            with nav_cell:
+                if st.button(label, use_container_width=True): st.session_state.page = page
 with nav_col2:
     if st.button("📑 Academic Report", width='stretch'): st.session_state.page = "Academic Report"
 
@@ -169,42 +506,41 @@ with k1: modern_card("Total Enrolled", int(summary_df.iloc[0]['Enrolled Count'])
 with k2: modern_card("Total Completed", int(summary_df.iloc[0]['Completed Count']), "border-green")
 with k3: modern_card("In Progress", int(summary_df.iloc[0]['In Progress']))
 with k4: modern_card("Not Started", int(summary_df.iloc[0]['Not Started']), "border-red")
-with k5: modern_card("Course Duration", "45 Hrs", "border-blue")
+with k5: modern_card("Course Duration", course.duration, "border-blue")
 
 # --- CASCADING FILTERS SECTION ---
 st.markdown("### 🛠️ Quick Filters")
 f1, f2, f3, f4 = st.columns(4)
 
+# Options and rows come from the per-snapshot filter engine; no frame is copied or masked here
+engine = get_filter_engine(snapshot.content_hash, df)
+selections = {}
+
 # Use Dynamic Keys based on reset_counter
 with f1: 
-    u_code = st.multiselect("University Code", 
-                            options=sorted(df["University Code"].unique()),
+    selections["University Code"] = st.multiselect("University Code", 
+                            options=engine.options("University Code", selections),
                             key=f"univ_{st.session_state.reset_counter}")
 
-temp_df = df.copy()
-if u_code: temp_df = temp_df[temp_df["University Code"].isin(u_code)]
-
 with f2: 
-    c_name = st.multiselect("College Name", 
-                            options=sorted(temp_df["College Name"].unique()),
+    selections["College Name"] = st.multiselect("College Name", 
+                            options=engine.options("College Name", selections),
                             key=f"coll_{st.session_state.reset_counter}")
 
-if c_name: temp_df = temp_df[temp_df["College Name"].isin(c_name)]
-
 with f3: 
-    t_name = st.multiselect("Trainer name", 
-                            options=sorted(temp_df["Trainer name"].unique()),
+    selections["Trainer name"] = st.multiselect("Trainer name", 
+                            options=engine.options("Trainer name", selections),
                             key=f"train_{st.session_state.reset_counter}")
 
-if t_name: temp_df = temp_df[temp_df["Trainer name"].isin(t_name)]
-
 with f4: 
-    b_size = st.multiselect("Batch No", 
-                            options=sorted(temp_df["Batch No"].unique()),
+    selections["Batch No"] = st.multiselect("Batch No", 
+                            options=engine.options("Batch No", selections),
                             key=f"batch_{st.session_state.reset_counter}")
 
-filt_df = temp_df.copy()
-if b_size: filt_df = filt_df[filt_df["Batch No"].isin(b_size)]
+with METRICS.timer("page.filters"):
+    filtered_rows = engine.rows(selections)
+    filt_df = df if filtered_rows is None else df.iloc[filtered_rows]
+cube = get_aggregate_cube(snapshot.content_hash, df)
 
 # Global Reset Button calling the reset function
 st.markdown("<br>", unsafe_allow_html=True)
@@ -218,7 +554,7 @@ st.markdown("---")
 # 5. PAGE CONDITIONAL CONTENT
 if st.session_state.page == "Home":
     # --- DYNAMIC MULTI-COLOR TRAINER TEXT LOGIC ---
-    trainer_uni_map = filt_df.groupby('Trainer name')['University Code'].unique()
+    trainer_uni_map = filt_df.groupby('Trainer name', observed=True)['University Code'].unique()
     active_trainer_list = sorted(trainer_uni_map.index.tolist())
     total_trainers_count = len(df['Trainer name'].unique())
     
@@ -242,15 +578,17 @@ if st.session_state.page == "Home":
     if filt_df.empty:
         st.warning("No data found for the selected filters.")
     else:
+        with METRICS.timer("page.kpis"):
+            kpis = cube.totals(selections)
         m1, m2, m3 = st.columns(3)
-        with m1: modern_card("Student Count", f"{filt_df['Students Count'].sum():,}")
-        with m2: modern_card("Weekly Hours Done", f"{filt_df['Batch Wise Weekly Hours Completed'].sum():.1f} Hrs")
-        with m3: modern_card("Pending Hours", f"{filt_df['Pending Hours Per Batch'].sum():.1f} Hrs", "border-red")
+        with m1: modern_card("Student Count", f"{kpis['Students Count']:,}")
+        with m2: modern_card("Weekly Hours Done", f"{kpis['Batch Wise Weekly Hours Completed']:.1f} Hrs")
+        with m3: modern_card("Pending Hours", f"{kpis['Pending Hours Per Batch']:.1f} Hrs", "border-red")
 
         m4, m5, m6 = st.columns(3)
-        with m4: modern_card("Intervention Completed", f"{filt_df['Intervention Completed'].sum():,}", "border-green")
-        with m5: modern_card("Pending Intervention", f"{filt_df['Pending Intervention '].sum():,}", "border-red")
-        with m6: modern_card("Completion %", f"{round(filt_df['Original_Val'].mean() * 100) if not filt_df['Original_Val'].isna().all() else 0}%")
+        with m4: modern_card("Intervention Completed", f"{kpis['Intervention Completed']:,}", "border-green")
+        with m5: modern_card("Pending Intervention", f"{kpis['Pending Intervention ']:,}", "border-red")
+        with m6: modern_card("Completion %", f"{kpis['Completion %']}%")
 
     # ===============================
     # 📈 WEEK-WISE INTERVENTION COUNT TREND (FILTER AWARE)
@@ -258,160 +596,34 @@ if st.session_state.page == "Home":
 
     st.markdown("### 📊 College-wise Weekly Intervention Trend")
 
-    # Identify weekday columns (week-wise structure)
-    week_cols = [col for col in filt_df.columns 
-                if any(day in col for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'])]
-
-    if len(week_cols) == 0:
+    if not week_cols:
         st.warning("No weekday columns found for weekly trend calculation.")
     else:
-        # Convert wide → long
-        long_df = filt_df.melt(
-            id_vars=['College Name', 'Batch No'],   # ✅ added Batch No
-            value_vars=week_cols,
-            var_name='Day',
-            value_name='Value'
-        )
-
-        # Convert to numeric
-        long_df['Value'] = pd.to_numeric(long_df['Value'], errors='coerce').fillna(0)
-
-        # Extract week number (Monday.1 → Week 2 etc.)
-        long_df['Week'] = long_df['Day'].str.extract(r'\.(\d+)')
-        long_df['Week'] = long_df['Week'].fillna('0')
-        long_df['Week'] = long_df['Week'].astype(int) + 1
-
-        # Create display label: Week 1, Week 2, ...
-        long_df['Week_Label'] = "Week " + long_df['Week'].astype(str)
-
-        # COUNT interventions (value > 0 = one intervention)
-        weekly_interventions = (
-            long_df[long_df['Value'] > 0]
-            .groupby(['College Name', 'Batch No', 'Week', 'Week_Label'])  # ✅ added Batch No
-            .size()
-            .reset_index(name='Intervention Count')
-        )
-
-        if weekly_interventions.empty:
-            st.warning("No intervention data available for selected filters.")
-        else:
-            # 🔽 Horizontal filters (College | Batch)
-            col_f1, col_f2 = st.columns(2)
-
-            with col_f1:
-                college_list = sorted(weekly_interventions['College Name'].unique())
-                selected_college = st.selectbox(
-                "Select College",
-                college_list,
-                key="weekly_trend_college"
-                )
-
-            with col_f2:
-                batch_list = sorted(
-                weekly_interventions[
-                weekly_interventions['College Name'] == selected_college
-                ]['Batch No'].unique()
-                )
-
-                selected_batch = st.selectbox(
-                "Select Batch No",
-                batch_list,
-                key="weekly_trend_batch"
-                )
-            trend_df = weekly_interventions[
-                (weekly_interventions['College Name'] == selected_college) &
-                (weekly_interventions['Batch No'] == selected_batch)
-            ].sort_values("Week")
-
-            # Plot trend with Week labels
-            fig = px.line(
-                trend_df,
-                x='Week_Label',
-                y='Intervention Count',
-                markers=True,
-                title=f"📈 {selected_college} (Batch {int(selected_batch)})",
-            )
-
-            fig.update_traces(
-                line=dict(width=1.5, color="black"),
-                marker=dict(size=9, color="#FF8C00"),
-                hovertemplate="<b>%{x}</b><br>Interventions: %{y}<extra></extra>"
-            )
-
-            fig.update_layout(
-                title_x=0.3,
-                font=dict(size=14),
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                xaxis_title="Week",
-                yaxis_title="Intervention Count",
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False, rangemode="tozero"),
-                margin=dict(l=40, r=40, t=60, b=40),
-            )
-
-            # Force Y-axis to show only integers
-            fig.update_yaxes(dtick=1)
-
-            st.plotly_chart(fig, use_container_width=True)
-
+        # Slice the per-snapshot long table down to the filtered rows
+        weekly_trend_section(weekly_interventions_for(filt_df), engine.key(selections))
 
         #st.markdown("<br>### 📈 Performance Visuals")
         c1, c2 = st.columns([2, 1])
         with c1:
             st.markdown("#### 📈 Overall Intervention Status")
 
-            # Aggregate completed and pending per college
-            college_status = (
-                filt_df.groupby("College Name")[["Intervention Completed", "Pending Intervention "]]
-                .sum()
-                .reset_index()
-            )
-
-            # Take top 10 colleges by total interventions
-            college_status["Total"] = (
-                college_status["Intervention Completed"] + college_status["Pending Intervention "]
-            )
-            college_status = college_status.sort_values("Total", ascending=False).head(10)
-
-            fig = px.bar(
-                college_status,
-                y="College Name",
-                x=["Intervention Completed", "Pending Intervention "],
-                orientation="h",
-                title="College-wise Intervention Status",
-                labels={"value": "Intervention Count", "variable": "Status"},
-                color_discrete_map={
-                    "Intervention Completed": "#28A745",
-                    "Pending Intervention ": "#E74C3C"
-                }
-            )
+            # Top 10 colleges by total interventions, rolled up from the aggregate cube
+            college_status = cube.college_status(selections, top=10)
 
-            fig.update_layout(
-                barmode="stack",
-                xaxis_title="Intervention Count",
-                yaxis_title="College Name",
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False),
-                title_x=0.0
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            with METRICS.timer("page.chart.college_status"):
+                fig = cached_figure("college_status", engine.key(selections),
+                                    lambda: college_status_figure(college_status))
+                st.plotly_chart(fig, use_container_width=True)
 
         with c2:
             #comp = int(round(filt_df['Intervention Completed'].sum()))
             #pend = int(round(filt_df['Pending Intervention '].sum()))
-            comp, pend = filt_df['Intervention Completed'].sum(), filt_df['Pending Intervention '].sum()
-            fig_pie = px.pie(values=[comp, pend], names=['Done', 'Pending'], title="Completion Percentage (%)",
-                             color=['Done', 'Pending'], color_discrete_map={'Done': '#28A745', 'Pending': '#E74C3C'})
-            fig_pie.update_traces(
-                texttemplate='%{percent:.0%}',   # rounds 33.5% → 34%
-                hovertemplate='%{label}: %{value} (%{percent:.0%})'
-            )
-            fig_pie.update_layout(title_x=0.0)
-            st.plotly_chart(fig_pie, use_container_width=True)
+            kpis = cube.totals(selections)
+            comp, pend = kpis['Intervention Completed'], kpis['Pending Intervention ']
+            with METRICS.timer("page.chart.completion_pie"):
+                # Keyed by the two values, so any selections with the same totals share it
+                fig_pie = cached_figure("completion_pie", (comp, pend), lambda: completion_pie_figure(comp, pend))
+                st.plotly_chart(fig_pie, use_container_width=True)
 
 elif st.session_state.page == "Academic Report":
     #st.markdown("### 📋 College-Wise Academic Progress Report")
@@ -419,113 +631,125 @@ elif st.session_state.page == "Academic Report":
     with h1:
         st.markdown("### 📋 College-Wise Academic Progress Report")
     with h2:
-        st.download_button(
-            "Download",
-            data=filt_df[['University Code', 'College Name', 'Trainer name', 'Batch No', 'Students Count',
-                      'Intervention Completed', 'Pending Intervention ',
-                      'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch', 'Completion %']]
-                .to_csv(index=False).encode('utf-8'),
-            file_name="College_Wise_Academic_Report.csv",
-            mime="text/csv"
+        # The Excel export also carries the weekly counts for the same filters
+        download_menu(
+            "College_Wise_Academic_Report",
+            lambda: {
+                "College-Wise Report": report_frame(filt_df),
+                "Weekly Interventions": weekly_interventions_for(filt_df).drop(columns='Week'),
+            },
+            engine.key(selections)
         )
 
     if filt_df.empty:
         st.warning("No data found for the selected filters.")
     else:
-        display_cols = ['University Code', 'College Name', 'Trainer name', 'Batch No', 'Students Count', 
-                        'Intervention Completed', 'Pending Intervention ', 
-                        'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch', 'Completion %']
-        st.dataframe(filt_df[display_cols].style.format({
-            'Completion %': '{:d}%', 'Batch Wise Weekly Hours Completed': '{:.1f}', 
-            'Pending Hours Per Batch': '{:.1f}', 'Batch No': '{:.2f}'
-        }), use_container_width=True, hide_index=True)
+        report_table_section(df, engine, get_table_pager(snapshot.content_hash, df), filtered_rows)
         
     # ===============================
     # 📊 WEEK-WISE INTERVENTION COUNT TABLE (WITH COLLEGE FILTER)
     # ===============================
-    #st.markdown("### 📈 Weekly Intervention Completed")
-    h3, h4 = st.columns([4, 1])
-    with h3:
-        st.markdown("### 📈 Weekly Intervention Completed")
-    
-    week_cols = [col for col in filt_df.columns 
-                 if any(day in col for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'])]
+    weekly_table_section(
+        weekly_interventions_for(filt_df).drop(columns='Week') if week_cols else None,
+        engine.key(selections)
+    )
+
+elif st.session_state.page == "All Courses":
+    st.markdown("### 🌐 Cross-Course Overview")
+    # Built from each course's shared snapshot and unfiltered cube; courses still loading are listed as such
+    entries = []
+    for other in COURSES:
+        other_snapshot = get_refreshers()[other.key].current(timeout=0)
+        totals = None
+        if other_snapshot is not None:
+            totals = get_aggregate_cube(other_snapshot.content_hash, other_snapshot.tracker).totals({})
+        entries.append((other, other_snapshot, totals))
+    overview = course_overview(entries)
+
+    o1, o2, o3 = st.columns(3)
+    with o1: modern_card("Courses", len(COURSES))
+    with o2: modern_card("Total Enrolled", f"{int(overview['Enrolled Count'].sum()):,}")
+    with o3: modern_card("Intervention Completed", f"{int(overview['Intervention Completed'].sum()):,}", "border-green")
+
+    st.dataframe(overview, use_container_width=True, hide_index=True)
+    loaded = overview.dropna(subset=["Intervention Completed"])
+    if not loaded.empty:
+        st.plotly_chart(course_overview_figure(loaded), use_container_width=True)
+
+elif st.session_state.page == "Progress History":
+    st.markdown("### 📈 Progress History")
+    history_section(get_history(course.key))
+
+elif st.session_state.page == "Admin":
+    st.markdown("### ⚙️ Performance Panel")
+    refresher = get_refresher()
+
+    a1, a2, a3 = st.columns(3)
+    with a1: modern_card("Snapshot", snapshot.content_hash[:12])
+    with a2: modern_card("Data Age", f"{int(snapshot.age)} s")
+    with a3: modern_card("Tracker Rows", f"{len(df):,}")
+
+    if refresher.last_error:
+        st.error(f"Last refresh failed: {refresher.last_error}")
+
+    if snapshot.stats:
+        st.markdown("#### Last Workbook Load")
+        st.dataframe(
+            [{"Stage": stage, "Seconds": round(seconds, 4)} for stage, seconds in snapshot.stats['timings'].items()],
+            use_container_width=True, hide_index=True
+        )
+        memory = snapshot.stats.get('memory')
+        if memory:
+            st.caption(f"Compact tracker: {memory['before']:,} → {memory['after']:,} bytes ({memory['saved']:,} saved)")
+        blocks = snapshot.stats.get('blocks')
+        if blocks:
+            st.caption(f"Incremental load: {blocks['cleaned']} of {blocks['total']} college blocks re-cleaned "
+                       f"({blocks['rows_cleaned']:,} rows), {blocks['reused']} reused")
+
+        quality = snapshot.stats.get('quality')
+        if quality:
+            st.markdown("#### Data Quality")
+            st.dataframe(
+                [{"Check": name, "Description": description, "Row Excluded": excluded, "Rows": quality['checks'][name]}
+                 for name, (description, excluded) in CHECKS.items()],
+                use_container_width=True, hide_index=True
+            )
+            quarantine = (snapshot.derived or {}).get("quarantine")
+            if quality['flagged'] and quarantine is not None:
+                st.caption(f"{quality['flagged']:,} rows flagged; {quality['excluded']:,} left out of the dashboard")
+                st.dataframe(quarantine, use_container_width=True, hide_index=True)
+            else:
+                st.success("No data quality issues in the last load.")
 
-    if len(week_cols) == 0:
-        st.warning("No weekday columns found for weekly calculation.")
+    metrics = METRICS.snapshot()
+    if not metrics['enabled']:
+        st.info("Instrumentation is off. Start the app with TRACKER_METRICS=1 to collect stage timings and counters.")
     else:
-        long_df = filt_df.melt(
-            id_vars=['College Name', 'Batch No'],
-            value_vars=week_cols,
-            var_name='Day',
-            value_name='Value'
+        st.markdown("#### Stage Timings")
+        st.dataframe([
+            {"Stage": name, "Calls": stat['count'], "Mean (ms)": round(stat['total'] / stat['count'] * 1000, 2),
+             "Max (ms)": round(stat['max'] * 1000, 2), "Last (ms)": round(stat['last'] * 1000, 2)}
+            for name, stat in sorted(metrics['timers'].items())
+        ], use_container_width=True, hide_index=True)
+
+        st.markdown("#### Counters")
+        st.dataframe(
+            [{"Counter": name, "Value": value} for name, value in sorted(metrics['counters'].items())],
+            use_container_width=True, hide_index=True
         )
 
-        long_df['Value'] = pd.to_numeric(long_df['Value'], errors='coerce').fillna(0)
+        adm1, adm2 = st.columns(2)
+        with adm1:
+            st.download_button("Download Metrics JSON", data=json.dumps(metrics, indent=2),
+                               file_name="tracker_metrics.json", mime="application/json")
+        with adm2:
+            st.button("Reset Metrics", on_click=METRICS.reset)
 
-        long_df['Week'] = long_df['Day'].str.extract(r'\.(\d+)')
-        long_df['Week'] = long_df['Week'].fillna('0')
-        long_df['Week'] = long_df['Week'].astype(int) + 1
+METRICS.record("page.run", time.perf_counter() - run_start)
 
-        long_df['Week_Label'] = "Week " + long_df['Week'].astype(str)
+@st.cache_resource
+def record_first_render():
+    # Once per process: from process start (interpreter, Streamlit and imports included) to the end of the first page run
+    METRICS.record("startup.first_render", time.time() - process_started_at())
 
-        weekly_interventions = (
-            long_df[long_df['Value'] > 0]
-            .groupby(['College Name', 'Batch No', 'Week_Label'])
-            .size()
-            .reset_index(name='Intervention Count')
-        )
-
-        if weekly_interventions.empty:
-            st.warning("No weekly intervention data available.")
-        else:
-            # 🔽 College + Batch filter for Weekly Intervention Completed Table
-            college_list = sorted(weekly_interventions['College Name'].unique())
-            col1, col2 = st.columns(2)
-
-            with col1:
-                selected_college_table = st.selectbox(
-                    "Select College for Weekly Table",
-                    ["All Colleges"] + college_list,
-                    key="weekly_table_college"
-                )
-
-            # Filter batch list based on college selection
-            if selected_college_table != "All Colleges":
-                batch_list = sorted(
-                    weekly_interventions[
-                        weekly_interventions['College Name'] == selected_college_table
-                    ]['Batch No'].dropna().unique()
-                )
-            else:
-                batch_list = sorted(weekly_interventions['Batch No'].dropna().unique())
-
-            with col2:
-                selected_batch_table = st.selectbox(
-                    "Select Batch for Weekly Table",
-                    ["All Batches"] + [str(b) for b in batch_list],
-                    key="weekly_table_batch"
-                )
-
-            # Apply filters
-            table_df = weekly_interventions.copy()
-            if selected_college_table != "All Colleges":
-                table_df = table_df[table_df['College Name'] == selected_college_table]
-
-            if selected_batch_table != "All Batches":
-                table_df = table_df[table_df['Batch No'].astype(str) == selected_batch_table]
-            # -------------------
-            # Move the download button to the heading row's right column
-            with h4:
-                st.download_button(
-                    "Download",
-                    data=table_df.to_csv(index=False).encode('utf-8') if 'table_df' in locals() else b"",
-                    file_name="Weekly_Intervention_Report.csv",
-                    mime="text/csv"
-                )
-            # Display table
-            st.dataframe(
-                table_df.sort_values(['College Name', 'Week_Label']),
-                use_container_width=True,
-                hide_index=True
-            )
+record_first_render()
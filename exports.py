@@ -0,0 +1,72 @@
+import io
+
+import pyarrow as pa
+
+from perf import LazyModule
+
+# Only needed once someone downloads an Excel or Parquet file
+openpyxl = LazyModule('openpyxl')
+pq = LazyModule('pyarrow.parquet')
+
+CHUNK_ROWS = 5000
+
+# format -> (file extension, MIME type, button label)
+FORMATS = {
+    'csv': ('csv', 'text/csv', 'CSV'),
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'Excel'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', 'Parquet'),
+}
+
+
+def _chunks(frame, size=CHUNK_ROWS):
+    for start in range(0, len(frame), size):
+        yield frame.iloc[start:start + size]
+
+
+def write_csv(frame, sink):
+    """UTF-8 CSV written chunk by chunk, so the full text never exists as one string."""
+    sink.write(frame.iloc[:0].to_csv(index=False).encode('utf-8'))
+    for chunk in _chunks(frame):
+        sink.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+
+
+def write_xlsx(sheets, sink):
+    """One worksheet per `{name: frame}` entry, streamed with openpyxl's write-only mode."""
+    wb = openpyxl.Workbook(write_only=True)
+    for name, frame in sheets.items():
+        ws = wb.create_sheet(title=name[:31])
+        ws.append([str(col) for col in frame.columns])
+        for chunk in _chunks(frame):
+            for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False):
+                ws.append(list(row))
+    wb.save(sink)
+
+
+def write_parquet(frame, sink):
+    """Parquet with one row group per chunk."""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    pq.write_table(table, sink, row_group_size=CHUNK_ROWS)
+
+
+def export_bytes(sheets, fmt):
+    """Serialize `{name: frame}`; CSV and Parquet take the first sheet, XLSX writes them all."""
+    sink = io.BytesIO()
+    if fmt == 'xlsx':
+        write_xlsx(sheets, sink)
+    elif fmt == 'csv':
+        write_csv(next(iter(sheets.values())), sink)
+    elif fmt == 'parquet':
+        write_parquet(next(iter(sheets.values())), sink)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return sink.getvalue()
+
+
+def lazy_export(cache, key, sheets, fmt):
+    """Zero-argument callable for st.download_button: builds the file only when clicked.
+
+    `sheets` is a zero-argument callable returning `{name: frame}`; the bytes are
+    memoized in `cache` under `(key, fmt)`, where `key` should identify the
+    snapshot and the filter state.
+    """
+    return lambda: cache.get_or_compute((key, fmt), lambda: export_bytes(sheets(), fmt))
@@ -0,0 +1,252 @@
+import hashlib
+import logging
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, replace
+
+from perf import LazyModule, METRICS
+
+# Imported by the first download, which happens on a refresher thread
+requests = LazyModule('requests')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+# (connect, read) seconds; the read timeout applies between received chunks, not to the whole body
+DEFAULT_TIMEOUT = (5, 30)
+# Seconds one download attempt may take in total, however steadily a slow source keeps trickling bytes
+DEFAULT_DEADLINE = 120
+# Workbooks larger than this are refused rather than buffered
+DEFAULT_MAX_BYTES = 64 * 2**20
+# Downloads are streamed into memory up to this size, then into a temporary file
+SPOOL_BYTES = 8 * 2**20
+CHUNK_BYTES = 256 * 2**10
+# Statuses worth retrying; anything else is final
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def shared_session():
+    """One pooled requests.Session for every fetcher, so connections to the same host are reused."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+class PayloadTooLarge(Exception):
+    """The source answered with more bytes than the fetcher's `max_bytes`."""
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """The workbook bytes last seen from the source, plus their validators."""
+    content: bytes
+    content_hash: str
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = 0.0
+    checked_at: float = 0.0
+    changed: bool = True
+
+
+class _Retry(Exception):
+    # A retryable HTTP status, raised so it takes the same backoff path as connection errors
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Flight:
+    # One in-progress download that concurrent callers wait on
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class WorkbookFetcher:
+    """Keeps the last downloaded workbook and revalidates it with conditional GETs.
+
+    Within `revalidate_after` seconds of the last check, `fetch()` answers from
+    memory without touching the network. After that it sends
+    If-None-Match / If-Modified-Since; a 304 (or a 200 carrying identical bytes)
+    keeps the cached result with `changed=False`, so callers can skip re-parsing.
+
+    Requests go through a pooled session with (connect, read) `timeout`s.
+    Connection errors, timeouts and RETRY_STATUSES are retried up to `retries`
+    times, sleeping a random time up to `backoff * 2**attempt` (capped at
+    `max_backoff`) in between. The body is streamed into a spooled buffer
+    and hashed on the way. A body over `max_bytes` raises PayloadTooLarge; an
+    attempt still receiving it after `deadline` seconds fails with a Timeout,
+    which is retried like any other. Callers arriving while a download is in
+    flight wait for it, no longer than all its attempts could take, and share
+    its result instead of starting another.
+    """
+
+    def __init__(self, url, revalidate_after=60, headers=None, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5,
+                 max_backoff=8.0, max_bytes=DEFAULT_MAX_BYTES, deadline=DEFAULT_DEADLINE, session=None):
+        self.url = url
+        self.revalidate_after = revalidate_after
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        # None: the shared pooled session, created by the first download
+        self.session = session
+        self._lock = threading.Lock()
+        self._last = None
+        self._flight = None
+
+    @property
+    def last(self):
+        return self._last
+
+    def fetch(self, force=False):
+        with self._lock:
+            last = self._last
+            if last is not None and not force and time.time() - last.checked_at < self.revalidate_after:
+                return replace(last, changed=False)
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+
+        if not leader:
+            METRICS.count('fetch.coalesced')
+            if not flight.done.wait(self._wait_limit()):
+                raise requests.Timeout("Timed out waiting for the download in progress")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._fetch(last)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.result is not None:
+                    self._last = flight.result
+                self._flight = None
+            flight.done.set()
+
+    def _wait_limit(self):
+        # The longest the leader can spend: every attempt running to its deadline plus the backoff between them
+        return (self.retries + 1) * self.deadline + self.retries * self.max_backoff
+
+    def _fetch(self, last):
+        headers = dict(self.headers)
+        if last is not None:
+            if last.etag:
+                headers['If-None-Match'] = last.etag
+            if last.last_modified:
+                headers['If-Modified-Since'] = last.last_modified
+
+        now = time.time()
+        with METRICS.timer('fetch.request'):
+            response, digest, size, body = self._download(headers)
+        METRICS.count('fetch.bytes', size)
+        if response.status_code == 304:
+            if last is None:
+                raise requests.HTTPError("304 Not Modified without a conditional request", response=response)
+            METRICS.count('fetch.not_modified')
+            return replace(last, checked_at=now, changed=False)
+
+        content_hash = digest.hexdigest()
+        changed = last is None or content_hash != last.content_hash
+        if changed:
+            body.seek(0)
+            content = body.read()
+        else:
+            content = last.content
+        body.close()
+        return FetchResult(
+            content=content,
+            content_hash=content_hash,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            fetched_at=now if changed else last.fetched_at,
+            checked_at=now,
+            changed=changed,
+        )
+
+    def _download(self, headers):
+        """GET with retries; returns the response, the body's sha256, its size and the spooled body."""
+        for attempt in range(self.retries + 1):
+            final = attempt == self.retries
+            try:
+                METRICS.count('fetch.requests')
+                with (self.session or shared_session()).get(self.url, headers=headers, timeout=self.timeout, stream=True) as response:
+                    if response.status_code in RETRY_STATUSES and not final:
+                        raise _Retry(f"HTTP {response.status_code}", response.headers.get('Retry-After'))
+                    if response.status_code == 304:
+                        return response, None, 0, None
+                    response.raise_for_status()
+                    return (response, *self._spool(response, time.monotonic() + self.deadline))
+            except (requests.ConnectionError, requests.Timeout, _Retry) as e:
+                if final:
+                    raise
+                delay = self._delay(attempt, getattr(e, 'retry_after', None))
+                METRICS.count('fetch.retries')
+                logger.warning("Workbook download failed (%s); retry %d/%d in %.1fs", e, attempt + 1, self.retries,
+                               delay)
+                time.sleep(delay)
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None and retry_after.isdigit():
+            return min(self.max_backoff, float(retry_after))
+        # "Full jitter": a random wait up to the exponential bound, so many replicas don't retry in step
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _spool(self, response, deadline):
+        length = response.headers.get('Content-Length')
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            raise PayloadTooLarge(f"Workbook is {int(length):,} bytes, over the {self.max_bytes:,} byte limit")
+
+        digest = hashlib.sha256()
+        size = 0
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        try:
+            for chunk in self._chunks(response, deadline):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise PayloadTooLarge(f"Workbook exceeds the {self.max_bytes:,} byte limit")
+                digest.update(chunk)
+                body.write(chunk)
+        except BaseException:
+            body.close()
+            raise
+        return digest, size, body
+
+
+    def _chunks(self, response, deadline):
+        # iter_content blocks until a whole chunk arrives, so a source trickling a few bytes per read timeout would
+        # never reach the deadline check; read1 returns after a single socket read instead
+        urllib3 = requests.packages.urllib3
+        while True:
+            try:
+                chunk = response.raw.read1(CHUNK_BYTES, decode_content=True)
+            except urllib3.exceptions.ReadTimeoutError as e:
+                raise requests.ConnectionError(e, request=response.request)
+            except urllib3.exceptions.ProtocolError as e:
+                raise requests.exceptions.ChunkedEncodingError(e)
+            if not chunk:
+                return
+            yield chunk
+            if time.monotonic() > deadline:
+                METRICS.count('fetch.deadline')
+                raise requests.Timeout(f"Download still running after {self.deadline}s")
@@ -0,0 +1,133 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from perf import METRICS
+
+# Order of the cascading Quick Filters: each level's options depend on the levels before it
+FILTER_COLS = ['University Code', 'College Name', 'Trainer name', 'Batch No']
+
+
+class LRUCache:
+    """Small thread-safe LRU shared by every session reading the same snapshot."""
+
+    def __init__(self, maxsize=512, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                if self.name:
+                    METRICS.count(f'cache.{self.name}.hit')
+                return self._data[key]
+            self.misses += 1
+        if self.name:
+            METRICS.count(f'cache.{self.name}.miss')
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+
+class FilterEngine:
+    """Cascading filters over one snapshot, answered from inverted indexes.
+
+    Each filter column is factorized once into sorted categories; every value
+    maps to the sorted array of row positions holding it. Applying a selection
+    is a union of those arrays per column and an intersection across columns,
+    so no frame is copied or masked until the caller takes the final rows.
+    `selections` maps column → iterable of selected values; empty means "all".
+    """
+
+    def __init__(self, tracker, columns=FILTER_COLS, cache_size=512, cache_name='filters'):
+        self.columns = [col for col in columns if col in tracker.columns]
+        self.n_rows = len(tracker)
+        self._categories = {}
+        self._codes = {}
+        self._index = {}
+        for col in self.columns:
+            codes, categories = pd.factorize(tracker[col], sort=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+            self._codes[col] = codes
+            self._categories[col] = categories
+            self._index[col] = {
+                value: order[bounds[i]:bounds[i + 1]].astype(np.int32)
+                for i, value in enumerate(categories.tolist())
+            }
+        self._cache = LRUCache(cache_size, name=cache_name)
+
+    def key(self, selections, upto=None):
+        """Hashable, order-insensitive form of the first `upto` filter levels."""
+        key = []
+        for col in self.columns[:upto]:
+            chosen = selections.get(col)
+            if chosen:
+                key.append((col, tuple(sorted(chosen))))
+        return tuple(key)
+
+    def rows(self, selections, upto=None):
+        """Sorted row positions matching the first `upto` filter levels; None means every row."""
+        key = self.key(selections, upto)
+        if not key:
+            return None
+        return self._cache.get_or_compute(('rows', key), lambda: self._intersect(key))
+
+    def _intersect(self, key):
+        rows = None
+        for col, chosen in key:
+            index = self._index[col]
+            hits = [index[value] for value in chosen if value in index]
+            matched = np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int32)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if len(rows) == 0:
+                break
+        return rows
+
+    def options(self, column, selections):
+        """Sorted distinct values of `column` left by the filter levels before it."""
+        level = self.columns.index(column)
+        key = self.key(selections, level)
+
+        def compute():
+            rows = self.rows(selections, upto=level)
+            categories = self._categories[column]
+            if rows is None:
+                return categories.tolist()
+            present = np.unique(self._codes[column][rows])
+            return categories[present[present >= 0]].tolist()
+
+        return self._cache.get_or_compute(('options', column, key), compute)
+
+    def search(self, text, columns=None):
+        """Sorted row positions where any of `columns` (default: the filter columns) contains `text`.
+
+        Case-insensitive substring match against each column's distinct values,
+        so the cost depends on the number of categories rather than rows.
+        """
+        text = text.strip().lower()
+        columns = tuple(col for col in (columns or self.columns) if col in self._index)
+
+        def compute():
+            hits = []
+            for col in columns:
+                index = self._index[col]
+                hits.extend(index[value] for value in index if text in str(value).lower())
+            return np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int32)
+
+        return self._cache.get_or_compute(('search', text, columns), compute)
+
+    def apply(self, selections):
+        """Row selection plus the options each filter level would offer for this state."""
+        return self.rows(selections), {col: self.options(col, selections) for col in self.columns}
@@ -0,0 +1,186 @@
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from analytics import AggregateCube
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = 'history.sqlite'
+
+# Cube cell keys and the KPI sums tracked over time, with their SQL column names
+KEY_COLS = {'University Code': 'university', 'College Name': 'college', 'Trainer name': 'trainer', 'Batch No': 'batch'}
+METRIC_COLS = {
+    'Students Count': 'students',
+    'Batch Wise Weekly Hours Completed': 'hours_done',
+    'Pending Hours Per Batch': 'hours_pending',
+    'Intervention Completed': 'completed',
+    'Pending Intervention ': 'pending',
+    '_completion_sum': 'completion_sum',
+    '_completion_n': 'completion_n',
+}
+# Trend columns as shown on the dashboard
+TREND_COLS = {
+    'students': 'Students Count', 'hours_done': 'Hours Completed', 'hours_pending': 'Pending Hours',
+    'completed': 'Intervention Completed', 'pending': 'Pending Intervention',
+}
+TREND_KINDS = {'college': 'college', 'trainer': 'trainer'}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT UNIQUE NOT NULL,
+    loaded_at REAL NOT NULL,
+    {', '.join(f'{name} REAL NOT NULL' for name in METRIC_COLS.values())}
+);
+CREATE TABLE IF NOT EXISTS cells (
+    id INTEGER PRIMARY KEY,
+    university TEXT, college TEXT, trainer TEXT, batch REAL,
+    {', '.join(f'{name} REAL NOT NULL' for name in METRIC_COLS.values())},
+    valid_from INTEGER NOT NULL,
+    valid_to INTEGER
+);
+CREATE INDEX IF NOT EXISTS cells_college ON cells (college, valid_from);
+CREATE INDEX IF NOT EXISTS cells_trainer ON cells (trainer, valid_from);
+CREATE INDEX IF NOT EXISTS cells_open ON cells (valid_to) WHERE valid_to IS NULL;
+"""
+
+
+def history_cells(tracker):
+    """KPI sums per (University, College, Trainer, Batch) cell, with the SQL column names."""
+    cells = AggregateCube(tracker).cells
+    cells = cells[list(KEY_COLS) + list(METRIC_COLS)].rename(columns={**KEY_COLS, **METRIC_COLS})
+    for col in ['university', 'college', 'trainer']:
+        cells[col] = cells[col].astype(str)
+    return cells.astype({col: float for col in ['batch', *METRIC_COLS.values()]})
+
+
+class HistoryStore:
+    """Every distinct workbook version, kept as validity ranges of cube cells in SQLite.
+
+    A cell row is written only when a (University, College, Trainer, Batch) cell
+    first appears or its KPI sums change, and it is closed (`valid_to`) when the
+    cell changes again or disappears, so unchanged rows cost nothing per version.
+    Whole-course totals are stored on each version row. Trend queries join the
+    versions with the ranges of one college's or trainer's cells.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call: writes come from the refresher thread, reads from sessions
+        return _closing(sqlite3.connect(self.path, timeout=30))
+
+    def append(self, snapshot):
+        """Record `snapshot` unless its content hash is already stored; returns True when added."""
+        cells = history_cells(snapshot.tracker)
+        metric_names = list(METRIC_COLS.values())
+        key_names = list(KEY_COLS.values())
+        with self._lock, self._connect() as db:
+            if db.execute('SELECT 1 FROM versions WHERE content_hash = ?', (snapshot.content_hash,)).fetchone():
+                return False
+            totals = cells[metric_names].sum()
+            version = db.execute(
+                f"INSERT INTO versions (content_hash, loaded_at, {', '.join(metric_names)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(metric_names))})",
+                (snapshot.content_hash, snapshot.loaded_at, *map(float, totals)),
+            ).lastrowid
+
+            current = pd.read_sql_query(
+                f"SELECT id, {', '.join(key_names + metric_names)} FROM cells WHERE valid_to IS NULL", db)
+            merged = current.merge(cells, on=key_names, how='outer', suffixes=('_old', ''), indicator=True)
+            both = (merged['_merge'] == 'both').to_numpy()
+            same = both & np.all(
+                [np.isclose(merged[f'{m}_old'], merged[m], rtol=0, atol=1e-9) for m in metric_names], axis=0)
+
+            closed = merged.loc[~same & (merged['_merge'] != 'right_only'), 'id'].astype(int).tolist()
+            added = merged.loc[~same & (merged['_merge'] != 'left_only'), key_names + metric_names]
+            db.executemany('UPDATE cells SET valid_to = ? WHERE id = ?', [(version, i) for i in closed])
+            db.executemany(
+                f"INSERT INTO cells ({', '.join(key_names + metric_names)}, valid_from) "
+                f"VALUES ({', '.join('?' * (len(key_names) + len(metric_names)))}, ?)",
+                [(*row, version) for row in added.itertuples(index=False, name=None)],
+            )
+        logger.info("History: recorded version %d (%s), %d cells changed, %d closed",
+                    version, snapshot.content_hash[:12], len(added), len(closed))
+        return True
+
+    def versions(self):
+        """Whole-course totals per recorded version, oldest first."""
+        with self._connect() as db:
+            frame = pd.read_sql_query(
+                f"SELECT id AS version, loaded_at, {', '.join(METRIC_COLS.values())} FROM versions ORDER BY id", db)
+        return _trend_frame(frame)
+
+    def names(self, kind):
+        """Every college or trainer that appears in any recorded version."""
+        column = TREND_KINDS[kind]
+        with self._connect() as db:
+            return [row[0] for row in db.execute(f"SELECT DISTINCT {column} FROM cells ORDER BY {column}")]
+
+    def trend(self, kind, name):
+        """Totals per version for one college or trainer (`kind` is 'college' or 'trainer').
+
+        Each cell range adds its sums at `valid_from` and removes them at
+        `valid_to`; a cumulative sum over the versions gives the totals, so the
+        cost is one indexed read of the entity's ranges.
+        """
+        column = TREND_KINDS[kind]
+        metric_names = list(METRIC_COLS.values())
+        with self._connect() as db:
+            versions = pd.read_sql_query("SELECT id AS version, loaded_at FROM versions ORDER BY id", db)
+            ranges = pd.read_sql_query(
+                f"SELECT valid_from, valid_to, {', '.join(metric_names)} FROM cells WHERE {column} = ?",
+                db, params=(name,))
+
+        ids = versions['version'].to_numpy()
+        start = np.searchsorted(ids, ranges['valid_from'].to_numpy())
+        # All-open ranges read back as an object column of None; make it numeric before filling
+        end = np.searchsorted(ids, pd.to_numeric(ranges['valid_to']).fillna(np.inf).to_numpy())
+        values = np.column_stack([ranges[metric_names].to_numpy(dtype=float), np.ones(len(ranges))])
+        delta = np.zeros((len(ids) + 1, values.shape[1]))
+        np.add.at(delta, start, values)
+        np.add.at(delta, end, -values)
+        totals = np.cumsum(delta, axis=0)[:-1]
+
+        frame = versions.assign(**{m: totals[:, i] for i, m in enumerate(metric_names)})
+        # Only the versions in which the college or trainer had any rows
+        return _trend_frame(frame[totals[:, -1] > 0].reset_index(drop=True))
+
+
+def _trend_frame(frame):
+    frame['Loaded At'] = pd.to_datetime(frame.pop('loaded_at'), unit='s')
+    n = frame.pop('completion_n')
+    frame['Completion %'] = (frame.pop('completion_sum') / n.where(n > 0) * 100).round().fillna(0).astype(int)
+    return frame.rename(columns=TREND_COLS).rename(columns={'version': 'Version'})
+
+
+class _closing:
+    """sqlite3 connection as a context manager that commits (or rolls back) and then closes."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is None:
+                self.db.commit()
+            else:
+                self.db.rollback()
+        finally:
+            self.db.close()
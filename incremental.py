@@ -0,0 +1,268 @@
+import hashlib
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from analytics import build_weekly_long
+from loader import (
+    STRUCTURAL_COLS, check_frame, check_rows, clean_tracker, compact_tracker, dashboard_columns, log_quality,
+    quality_stats, read_workbook, require_columns,
+)
+from perf import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalLoader:
+    """Drop-in for load_workbook() that only re-cleans the tracker blocks that changed.
+
+    The raw sheet is split into blocks, one per college (a block starts at each
+    non-blank 'College Name'). A block's identity is the hash of its raw rows
+    plus the structural values forward-filled into it from above, so a block
+    whose hash was seen in the previous load cleans to exactly the same rows.
+    Those rows, their part of the weekly long table and their row check
+    results are reused; only new or edited blocks go through clean_tracker()
+    and check_rows() (in a single batched call). check_frame()'s cross-row
+    checks run over the whole assembled tracker.
+
+    `reader` parses the workbook (see courses.pooled_reader() for a process pool).
+    Returns `(tracker, summary, stats)` like load_workbook(); `stats['derived']`
+    carries the patched weekly long table and the quarantine, and `stats['blocks']`
+    the reuse counts.
+    """
+
+    def __init__(self, usecols=dashboard_columns, compact=False, reader=read_workbook):
+        self.usecols = usecols
+        self.compact = compact
+        self.reader = reader
+        self._lock = threading.Lock()
+        self._columns = None
+        self._tracker = None
+        self._weekly_long = None
+        self._order = None
+        self._blocks = {}  # block hash -> (start, stop) rows in self._tracker
+        self._issues = None  # check_rows() issue mask per row of self._tracker
+        self._excluded = {}  # block hash -> rows check_rows() excluded from it
+        self._quality = None
+        self._quarantine = None
+
+    def __call__(self, content):
+        with self._lock:
+            return self._load(content)
+
+    def _load(self, content):
+        tracker_raw, summary, timings = self.reader(content, usecols=self.usecols)
+        stats = {'timings': timings}
+        require_columns(tracker_raw.columns)
+
+        start = time.perf_counter()
+        columns = tuple(tracker_raw.columns)
+        if columns != self._columns:
+            # Different sheet layout: nothing from the previous load can be reused
+            self._blocks = {}
+        block_of_row, hashes, carry = _split_blocks(tracker_raw)
+        timings['diff'] = time.perf_counter() - start
+
+        n_blocks = len(hashes)
+        reused = [h in self._blocks for h in hashes]
+        changed = [b for b in range(n_blocks) if not reused[b]]
+        if not changed and hashes == self._order:
+            # Only the Summary sheet or unused columns changed
+            stats['blocks'] = {'total': n_blocks, 'reused': n_blocks, 'cleaned': 0, 'rows_cleaned': 0}
+            stats['quality'] = self._quality
+            stats['derived'] = {'weekly_long': self._weekly_long, 'quarantine': self._quarantine}
+            timings['total'] = sum(timings.values())
+            return self._tracker, summary, stats
+
+        cleaned, issues, excluded = self._clean_blocks(tracker_raw, block_of_row, carry, changed, timings)
+
+        start = time.perf_counter()
+        tracker, new_rows, old_rows, ranges = self._assemble(cleaned, hashes, reused)
+        timings['assemble'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        issues, excluded = self._carry_checks(issues, excluded, new_rows, old_rows, hashes, reused, len(tracker))
+        quarantine, counts = check_frame(tracker, issues, list(excluded.values()))
+        quality = quality_stats(quarantine, counts)
+        timings['validate'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        weekly_long = self._patch_weekly(cleaned, new_rows, old_rows)
+        timings['weekly'] = time.perf_counter() - start
+        timings['total'] = sum(timings.values())
+
+        self._columns = columns
+        self._order = hashes
+        self._tracker = tracker
+        self._weekly_long = weekly_long
+        self._blocks = dict(zip(hashes, ranges))
+        self._issues = issues
+        self._excluded = excluded
+        self._quality = quality
+        self._quarantine = quarantine
+
+        stats['blocks'] = {'total': n_blocks, 'reused': n_blocks - len(changed), 'cleaned': len(changed),
+                           'rows_cleaned': len(cleaned)}
+        stats['quality'] = quality
+        stats['derived'] = {'weekly_long': weekly_long, 'quarantine': quarantine}
+        for stage, seconds in timings.items():
+            METRICS.record(f'load.{stage}', seconds)
+        METRICS.count('load.rows', len(cleaned))
+        logger.info("Loaded workbook incrementally: %d/%d blocks re-cleaned (%d rows) in %.3fs",
+                    len(changed), n_blocks, len(cleaned), timings['total'])
+        log_quality(quality)
+        return tracker, summary, stats
+
+    def _clean_blocks(self, raw, block_of_row, carry, changed, timings):
+        """Clean, check and (optionally) compact the changed blocks; returns check_rows()'s result."""
+        start = time.perf_counter()
+        struct = [c for c in STRUCTURAL_COLS if c in raw.columns]
+        rows = np.flatnonzero(np.isin(block_of_row, changed))
+        part = raw.iloc[rows].copy()
+        part['_block'] = block_of_row[rows]
+
+        if len(part):
+            # Seed each block's first row with what the full-sheet ffill would have carried into it
+            blocks = part['_block'].to_numpy()
+            firsts = part.index[np.flatnonzero(np.r_[True, np.diff(blocks) != 0])]
+            carried = carry.iloc[part.loc[firsts, '_block'].to_numpy()].set_axis(firsts)
+            part.loc[firsts, struct] = part.loc[firsts, struct].fillna(carried)
+
+        cleaned = clean_tracker(part, derived=not self.compact, flag_coerced=True)
+        timings['clean'] = time.perf_counter() - start
+
+        # Excluded rows are dropped before block ranges are taken
+        start = time.perf_counter()
+        cleaned, issues, excluded = check_rows(cleaned)
+        timings['validate'] = time.perf_counter() - start
+
+        if self.compact:
+            block_ids = cleaned['_block'].to_numpy()
+            cleaned, _memory = compact_tracker(cleaned.drop(columns='_block'))
+            cleaned['_block'] = block_ids
+        return cleaned, issues, excluded
+
+    def _carry_checks(self, issues, excluded, new_rows, old_rows, hashes, reused, n_rows):
+        """Row issue masks for the assembled tracker, and the excluded rows per block hash."""
+        new_src, new_dst = new_rows
+        old_src, old_dst = old_rows
+        final = np.zeros(n_rows, dtype=issues.dtype)
+        final[new_dst] = issues[new_src]
+        if len(old_src):
+            final[old_dst] = self._issues[old_src]
+
+        fresh = dict(tuple(excluded.groupby('_block'))) if len(excluded) else {}
+        by_hash = {}
+        for b, h in enumerate(hashes):
+            rows = self._excluded.get(h) if reused[b] else fresh.get(b)
+            if rows is not None:
+                by_hash[h] = rows
+        return final, by_hash
+
+    def _assemble(self, cleaned, hashes, reused):
+        """Stitch reused rows of the previous tracker and freshly cleaned rows together in block order.
+
+        Returns the tracker, `(source rows, final rows)` for the cleaned and the
+        reused parts, and each block's final `(start, stop)`.
+        """
+        new_block = cleaned['_block'].to_numpy()
+        cleaned_blocks = {}
+        if len(new_block):
+            bounds = np.flatnonzero(np.r_[True, np.diff(new_block) != 0, True])
+            for s, e in zip(bounds[:-1], bounds[1:]):
+                cleaned_blocks[new_block[s]] = (s, e)
+
+        parts = {True: ([], []), False: ([], [])}  # reused? -> (source rows, final rows)
+        ranges = []
+        position = 0
+        for b, h in enumerate(hashes):
+            if reused[b]:
+                s, e = self._blocks[h]
+            else:
+                # Blocks cleaned down to nothing (a Grand Total row) keep an empty range
+                s, e = cleaned_blocks.get(b, (0, 0))
+            src, dst = parts[reused[b]]
+            src.append(np.arange(s, e))
+            dst.append(np.arange(position, position + e - s))
+            ranges.append((position, position + e - s))
+            position += e - s
+
+        old_src, old_dst, new_src, new_dst = (
+            np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+            for rows in (*parts[True], *parts[False])
+        )
+
+        fresh = cleaned.iloc[new_src].drop(columns='_block')
+        if len(old_src):
+            tracker = _concat([self._tracker.iloc[old_src], fresh])
+            placement = np.argsort(np.concatenate([old_dst, new_dst]), kind='stable')
+            tracker = tracker.iloc[placement].reset_index(drop=True)
+        else:
+            tracker = fresh.reset_index(drop=True)
+        return tracker, (new_src, new_dst), (old_src, old_dst), ranges
+
+    def _patch_weekly(self, cleaned, new_rows, old_rows):
+        new_src, new_dst = new_rows
+        old_src, old_dst = old_rows
+        parts = []
+
+        if len(old_src) and self._weekly_long is not None:
+            old_to_final = np.full(len(self._tracker), -1, dtype=np.int64)
+            old_to_final[old_src] = old_dst
+            prev = self._weekly_long
+            target = old_to_final[prev['row'].to_numpy()]
+            keep = target >= 0
+            parts.append(prev[keep].assign(row=target[keep].astype(np.int32)))
+
+        if len(new_src):
+            fresh = build_weekly_long(cleaned.iloc[new_src].reset_index(drop=True))
+            parts.append(fresh.assign(row=new_dst[fresh['row'].to_numpy()].astype(np.int32)))
+
+        if not parts:
+            return build_weekly_long(cleaned.iloc[:0])
+        weekly_long = _concat(parts).sort_values(['row', 'Week'], kind='stable').reset_index(drop=True)
+        weeks = np.unique(weekly_long['Week'].to_numpy())
+        weekly_long['Week_Label'] = pd.Categorical.from_codes(
+            np.searchsorted(weeks, weekly_long['Week'].to_numpy()), [f"Week {n}" for n in weeks])
+        return weekly_long
+
+
+def _split_blocks(raw):
+    """Block number per raw row, a content hash per block, and each block's ffill carry-in."""
+    starts = raw['College Name'].notna().to_numpy() if 'College Name' in raw.columns else np.zeros(len(raw), bool)
+    # Any rows above the first college form block 0
+    block_of_row = np.cumsum(starts) - (1 if len(raw) and starts[0] else 0)
+    n_blocks = int(block_of_row[-1]) + 1 if len(raw) else 0
+
+    struct = [c for c in STRUCTURAL_COLS if c in raw.columns]
+    filled = raw[struct].ffill()
+    first_rows = np.searchsorted(block_of_row, np.arange(n_blocks))
+    carry = filled.shift(1).iloc[first_rows].reset_index(drop=True)
+
+    row_hash = pd.util.hash_pandas_object(raw, index=False).to_numpy()
+    carry_hash = pd.util.hash_pandas_object(carry.astype(str), index=False).to_numpy()
+    bounds = np.r_[first_rows, len(raw)]
+    hashes = [
+        hashlib.blake2b(row_hash[bounds[b]:bounds[b + 1]].tobytes() + carry_hash[b].tobytes(),
+                        digest_size=16).hexdigest()
+        for b in range(n_blocks)
+    ]
+    return block_of_row, hashes, carry
+
+
+def _concat(frames):
+    """pd.concat that keeps categorical columns categorical, with the sorted categories actually used."""
+    frames = [f for f in frames if len(f.columns)]
+    columns = {}
+    for col in frames[0].columns:
+        series = [f[col] for f in frames]
+        if all(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+            merged = union_categoricals(series, sort_categories=True)
+            columns[col] = pd.Series(merged.remove_unused_categories(), name=col)
+        else:
+            columns[col] = pd.concat(series, ignore_index=True)
+    return pd.DataFrame(columns)
@@ -0,0 +1,391 @@
+import io
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+
+from perf import LazyModule, METRICS
+
+# Needed only to parse a downloaded workbook, which runs off the page thread (or in a pool worker)
+openpyxl = LazyModule('openpyxl')
+
+logger = logging.getLogger(__name__)
+
+TRACKER_SHEET = 'Intervention Tracker'
+SUMMARY_SHEET = 'Summary'
+TRACKER_HEADER_ROW = 4  # rows above the tracker header (pd.read_excel skiprows=4)
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+STRUCTURAL_COLS = ['University Code', 'College Name', 'Trainer name', 'Batch No', 'Start Date', 'End Date', 'Timing']
+NUMERIC_COLS = [
+    'Students Count', 'Intervention Completed', 'Pending Intervention ',
+    'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch', 'Batch No'
+]
+NAME_COLS = ['University Code', 'College Name', 'Trainer name']
+# Columns whose non-numeric cells clean_tracker() coerces; bit i of '_coerced' is COERCED_COLS[i]
+COERCED_COLS = NUMERIC_COLS + ['Completion Percentage']
+
+# Columns the dashboard cannot do without: the filters, the KPI cards and cube sums, the
+# report table and the history metrics read all of them (note the trailing space in 'Pending Intervention ')
+REQUIRED_COLS = [
+    'University Code', 'College Name', 'Trainer name', 'Batch No', 'Students Count',
+    'Intervention Completed', 'Pending Intervention ', 'Completion Percentage',
+    'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch',
+]
+# Columns shown for each quarantined row
+QUARANTINE_COLS = REQUIRED_COLS
+
+# name -> (description, whether the row is dropped from the tracker); bit i of an issue mask is CHECKS[i]
+CHECKS = {
+    'non_numeric': ("Text in a numeric column (would have been counted as 0)", True),
+    'negative': ("Negative count or hours", True),
+    'completion_range': ("Completion Percentage outside 0-100%", True),
+    'inconsistent_totals': ("Completion Percentage does not match completed / (completed + pending)", False),
+    'weekday_value': ("Weekday cell other than blank, 0 or 1", False),
+    'unknown_name': ("Blank University, College or Trainer name", False),
+    'duplicate_batch': ("Same University, College and Batch No on several rows", False),
+}
+_BITS = {name: 1 << i for i, name in enumerate(CHECKS)}
+_EXCLUDING = sum(_BITS[name] for name, (_, excluded) in CHECKS.items() if excluded)
+# Tolerance for the workbook's rounded Completion Percentage
+_COMPLETION_TOLERANCE = 0.005
+
+NAN = float('nan')
+
+
+def is_week_col(col):
+    return any(day in str(col) for day in WEEKDAYS)
+
+
+def dashboard_columns(col):
+    """usecols predicate keeping only the tracker columns the dashboard reads."""
+    return col in STRUCTURAL_COLS or col in NUMERIC_COLS or col == 'Completion Percentage' or is_week_col(col)
+
+
+def _header_names(values):
+    # Same naming as pd.read_excel: blank headers become 'Unnamed: i', repeats get '.1', '.2', ...
+    names = [f"Unnamed: {i}" if value is None else value for i, value in enumerate(values)]
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _na_cells():
+    # Cells pd.read_excel reads as NaN: formula errors ('#DIV/0!', ...) and its default NA strings ('N/A', 'null', ...)
+    return frozenset(openpyxl.cell.cell.ERROR_CODES) | STR_NA_VALUES
+
+
+def _cell(value, na_cells):
+    # Mirrors pandas' openpyxl reader: empty, error and NA-string cells are NaN, integral floats become ints
+    if value is None:
+        return NAN
+    if isinstance(value, str):
+        return NAN if value in na_cells else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _read_sheet(ws, header_row=0, usecols=None):
+    na_cells = _na_cells()
+    rows = ws.iter_rows(values_only=True)
+    for _ in range(header_row):
+        next(rows, None)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    while header and header[-1] is None:
+        header = header[:-1]
+    names = _header_names(header)
+
+    if usecols is None:
+        keep = list(range(len(names)))
+    elif callable(usecols):
+        keep = [i for i, name in enumerate(names) if usecols(name)]
+    else:
+        wanted = set(usecols)
+        keep = [i for i, name in enumerate(names) if name in wanted]
+
+    width = len(names)
+    columns = [[] for _ in keep]
+    n_rows, n_filled = 0, 0
+    for row in rows:
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        for values, i in zip(columns, keep):
+            values.append(_cell(row[i], na_cells))
+        n_rows += 1
+        if any(v is not None for v in row):
+            n_filled = n_rows
+    # Like pd.read_excel: blank rows inside the sheet are kept, trailing ones dropped
+    return pd.DataFrame({names[i]: values[:n_filled] for values, i in zip(columns, keep)})
+
+
+def read_workbook(content, usecols=None):
+    """Read the tracker and summary sheets from one read-only openpyxl load.
+
+    `usecols` (a list of names or a predicate) trims the tracker sheet while it
+    is streamed. Returns `(tracker, summary, timings)`, timings in seconds.
+    """
+    timings = {}
+    start = time.perf_counter()
+    wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    timings['open'] = time.perf_counter() - start
+    try:
+        mark = time.perf_counter()
+        tracker = _read_sheet(wb[TRACKER_SHEET], header_row=TRACKER_HEADER_ROW, usecols=usecols)
+        timings['tracker'] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        summary = _read_sheet(wb[SUMMARY_SHEET])
+        timings['summary'] = time.perf_counter() - mark
+    finally:
+        wb.close()
+    return tracker, summary, timings
+
+
+def clean_tracker(tracker, derived=True, flag_coerced=False):
+    """Forward-fill, coerce and name-fix the raw tracker; drops the Total rows.
+
+    With `flag_coerced`, a '_coerced' bitmask column records which COERCED_COLS
+    held text that could not be read as a number (for check_rows()).
+    """
+    existing_struct = [c for c in STRUCTURAL_COLS if c in tracker.columns]
+    tracker[existing_struct] = tracker[existing_struct].ffill()
+    coerced = np.zeros(len(tracker), dtype=np.int32)
+
+    for col in NUMERIC_COLS:
+        if col in tracker.columns:
+            numeric = pd.to_numeric(tracker[col], errors='coerce')
+            coerced |= (numeric.isna() & tracker[col].notna()).to_numpy() << COERCED_COLS.index(col)
+            tracker[col] = numeric.fillna(0)
+            if 'Hours' not in col and 'Percentage' not in col and 'Batch No' not in col:
+                tracker[col] = tracker[col].astype(int)
+
+    for col in NAME_COLS:
+        if col in tracker.columns:
+            tracker[col] = tracker[col].astype(str).replace('nan', 'Unknown')
+
+    completion = pd.to_numeric(tracker['Completion Percentage'], errors='coerce')
+    blank = tracker['Completion Percentage'].isna()
+    coerced |= (completion.isna() & ~blank).to_numpy() << COERCED_COLS.index('Completion Percentage')
+    tracker['Completion Percentage'] = completion
+    if flag_coerced:
+        tracker['_coerced'] = coerced
+    if derived:
+        tracker['Original_Val'] = tracker['Completion Percentage']
+        tracker['Completion %'] = completion_pct(tracker)
+
+    # Drop subtotal rows last so the column fixes above never write into a filtered slice.
+    # Row labels double as positions for the per-snapshot lookup tables.
+    keep = ~tracker['College Name'].astype(str).str.contains('Total|Grand', case=False, na=False)
+    return tracker[keep].reset_index(drop=True)
+
+
+def missing_columns(columns):
+    """REQUIRED_COLS that are not among `columns`."""
+    present = set(columns)
+    return [col for col in REQUIRED_COLS if col not in present]
+
+
+def require_columns(columns):
+    """Raise ValueError naming the missing REQUIRED_COLS, so a bad layout never replaces a good snapshot."""
+    missing = missing_columns(columns)
+    if missing:
+        raise ValueError(f"Tracker sheet is missing required columns: {missing}")
+
+
+def check_rows(tracker):
+    """Row-local checks over a cleaned tracker that still has clean_tracker()'s '_coerced' column.
+
+    Each check is one columnar comparison; the results are OR-ed into one issue
+    mask per row. Returns `(kept, issues, excluded)`: the rows without an
+    excluding issue (and without '_coerced'), their issue masks, and the
+    excluded rows with their masks in an '_issues' column, for check_frame().
+    """
+    issues = np.zeros(len(tracker), dtype=np.int32)
+    issues[tracker['_coerced'].to_numpy() != 0] |= _BITS['non_numeric']
+
+    numeric = [col for col in NUMERIC_COLS if col in tracker.columns]
+    issues[(tracker[numeric].to_numpy(dtype=float) < 0).any(axis=1)] |= _BITS['negative']
+
+    completion = tracker['Completion Percentage'].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        issues[(completion < 0) | (completion > 1)] |= _BITS['completion_range']
+
+        done = tracker['Intervention Completed'].to_numpy(dtype=float)
+        planned = done + tracker['Pending Intervention '].to_numpy(dtype=float)
+        expected = np.divide(done, planned, out=np.full(len(tracker), np.nan), where=planned > 0)
+        mismatch = np.abs(completion - expected) > _COMPLETION_TOLERANCE
+    issues[mismatch] |= _BITS['inconsistent_totals']
+
+    week_cols = [col for col in tracker.columns if is_week_col(col)]
+    if week_cols:
+        days = tracker[week_cols]
+        filled = days.notna().to_numpy()
+        # Only columns holding text need coercing; the rest convert as one block
+        text = [col for col, dtype in days.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if text:
+            days = days.assign(**{col: pd.to_numeric(days[col], errors='coerce') for col in text})
+        odd = filled & ~np.isin(days.to_numpy(dtype=float), (0, 1))
+        issues[odd.any(axis=1)] |= _BITS['weekday_value']
+
+    names = [col for col in NAME_COLS if col in tracker.columns]
+    issues[(tracker[names] == 'Unknown').to_numpy().any(axis=1)] |= _BITS['unknown_name']
+
+    drop = (issues & _EXCLUDING) != 0
+    excluded = tracker[drop].assign(_issues=issues[drop])
+    kept = tracker[~drop].drop(columns='_coerced').reset_index(drop=True)
+    return kept, issues[~drop], excluded
+
+
+def check_frame(tracker, issues, excluded):
+    """Cross-row checks over the final tracker, then the quarantine frame and per-check counts.
+
+    `issues` are check_rows()'s masks aligned with `tracker`'s rows and
+    `excluded` a list of its excluded frames. Returns `(quarantine, counts)`.
+    """
+    issues = issues.copy()
+    issues[tracker.duplicated(['University Code', 'College Name', 'Batch No'], keep=False).to_numpy()] |= \
+        _BITS['duplicate_batch']
+
+    flagged = np.flatnonzero(issues)
+    kept = _quarantine_part(tracker.iloc[flagged], issues[flagged], 0)
+    parts = [_quarantine_part(rows, rows['_issues'].to_numpy(), rows['_coerced'].to_numpy())
+             for rows in excluded if len(rows)]
+    quarantine = pd.concat(parts + [kept], ignore_index=True) if parts else kept
+
+    masks = quarantine.pop('_issues').to_numpy()
+    coerced = quarantine.pop('_coerced').to_numpy()
+    counts = {name: int(np.count_nonzero(masks & bit)) for name, bit in _BITS.items()}
+    quarantine['Issues'] = [_describe(mask, bits) for mask, bits in zip(masks, coerced)]
+    quarantine['Excluded'] = (masks & _EXCLUDING) != 0
+    return quarantine, counts
+
+
+def quality_stats(quarantine, counts):
+    """Summary of check_frame()'s result for `stats['quality']`."""
+    return {'checks': counts, 'flagged': len(quarantine), 'excluded': int(quarantine['Excluded'].sum())}
+
+
+def log_quality(quality):
+    if quality['flagged']:
+        found = ", ".join(f"{name}={n}" for name, n in quality['checks'].items() if n)
+        logger.warning("Data quality: %d rows flagged, %d excluded (%s)", quality['flagged'], quality['excluded'], found)
+
+
+def _quarantine_part(rows, issues, coerced):
+    part = pd.DataFrame({col: rows[col].to_numpy() for col in QUARANTINE_COLS})
+    part['_issues'] = issues
+    part['_coerced'] = coerced
+    return part
+
+
+def _describe(mask, coerced):
+    # Runs only for flagged rows, which are few
+    labels = []
+    for name, bit in _BITS.items():
+        if mask & bit:
+            if name == 'non_numeric':
+                cols = [col.strip() for i, col in enumerate(COERCED_COLS) if coerced & (1 << i)]
+                name = f"{name} ({', '.join(cols)})"
+            labels.append(name)
+    return ', '.join(labels)
+
+
+def completion_pct(tracker):
+    """Integer 'Completion %' derived from 'Completion Percentage' (0 when blank)."""
+    return (tracker['Completion Percentage'] * 100).fillna(0).astype(int)
+
+
+def compact_tracker(tracker):
+    """Shrink a cleaned tracker for sharing: categorical names, downcast numbers, int8 weekdays.
+
+    Returns `(tracker, memory)` with the deep byte size before and after.
+    """
+    before = int(tracker.memory_usage(deep=True).sum())
+    # Weekday cells are converted as one 2-D array rather than column by column
+    week_cols = [col for col in tracker.columns if is_week_col(col)]
+    days = np.nan_to_num(tracker[week_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float))
+    integral = ((days % 1 == 0) & (days >= -128) & (days <= 127)).all(axis=0)
+    weekdays = {
+        col: days[:, i].astype('int8' if integral[i] else 'float32')
+        for i, col in enumerate(week_cols)
+    }
+
+    columns = {}
+    for col in tracker.columns:
+        values = tracker[col]
+        if col in NAME_COLS or col == 'Timing':
+            values = values.astype('category')
+        elif col in weekdays:
+            values = pd.Series(weekdays[col], index=tracker.index, name=col)
+        elif pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values) and col not in ('Completion Percentage', 'Batch No'):
+            # Completion Percentage stays float64 so the rounded mean matches the full-precision view, and
+            # Batch No because it is a filter key: float32 would turn batch 1.1 into 1.100000023841858
+            values = pd.to_numeric(values, downcast='float')
+        columns[col] = values
+    tracker = pd.DataFrame(columns)
+    after = int(tracker.memory_usage(deep=True).sum())
+    return tracker, {'before': before, 'after': after, 'saved': before - after}
+
+
+def load_workbook(content, usecols=dashboard_columns, compact=False, reader=read_workbook):
+    """Parse, clean and validate a workbook; returns `(tracker, summary, stats)`.
+
+    `stats['timings']` holds per-stage seconds. Rows failing an excluding check
+    are left out of the tracker; `stats['quality']` counts the issues per check
+    and `stats['derived']['quarantine']` lists the flagged rows. A sheet missing
+    REQUIRED_COLS raises ValueError. With `compact`, the tracker goes
+    through compact_tracker(), the stored 'Original_Val' / 'Completion %'
+    columns are left out (use completion_pct() on the rows being shown) and
+    `stats['memory']` reports the bytes saved. `reader` replaces read_workbook(),
+    e.g. to parse on a process pool.
+    """
+    tracker, summary, timings = reader(content, usecols=usecols)
+    stats = {'timings': timings}
+    require_columns(tracker.columns)
+
+    start = time.perf_counter()
+    tracker = clean_tracker(tracker, derived=not compact, flag_coerced=True)
+    timings['clean'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tracker, issues, excluded = check_rows(tracker)
+    timings['validate'] = time.perf_counter() - start
+
+    if compact:
+        start = time.perf_counter()
+        tracker, stats['memory'] = compact_tracker(tracker)
+        timings['compact'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    quarantine, counts = check_frame(tracker, issues, [excluded])
+    timings['validate'] += time.perf_counter() - start
+    stats['quality'] = quality_stats(quarantine, counts)
+    stats['derived'] = {'quarantine': quarantine}
+
+    timings['total'] = sum(timings.values())
+    for stage, seconds in timings.items():
+        METRICS.record(f'load.{stage}', seconds)
+    METRICS.count('load.rows', len(tracker))
+    METRICS.count('load.quarantined', len(quarantine))
+
+    logger.info("Loaded workbook: %d tracker rows in %.3fs (%s)", len(tracker), timings['total'],
+                ", ".join(f"{k}={v:.3f}s" for k, v in timings.items() if k != 'total'))
+    log_quality(stats['quality'])
+    if compact:
+        memory = stats['memory']
+        logger.info("Compact tracker: %d -> %d bytes (%d saved)", memory['before'], memory['after'], memory['saved'])
+    return tracker, summary, stats
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from filters import LRUCache
+
+
+class TablePager:
+    """Server-side sort and paging over one snapshot's tracker rows.
+
+    Each sort column is ranked once over the whole tracker (its position in a
+    stable sort), so ordering any filtered subset is an argsort of those ranks
+    and only the requested page of rows is ever materialized.
+    """
+
+    def __init__(self, tracker, cache_size=32):
+        self.tracker = tracker
+        self._ranks = LRUCache(cache_size, name='sort_ranks')
+
+    def rank(self, column):
+        def compute():
+            values = self.tracker[column]
+            # Categoricals are built with sorted categories, so their codes sort like the values
+            values = values.cat.codes if isinstance(values.dtype, pd.CategoricalDtype) else values
+            order = np.argsort(values.to_numpy(), kind='stable')
+            rank = np.empty(len(order), dtype=np.int32)
+            rank[order] = np.arange(len(order), dtype=np.int32)
+            return rank
+
+        return self._ranks.get_or_compute(column, compute)
+
+    def order(self, rows=None, column=None, ascending=True):
+        """Row positions (None = all) in display order; sheet order when `column` is None."""
+        rows = np.arange(len(self.tracker)) if rows is None else np.asarray(rows)
+        if column is None:
+            return rows if ascending else rows[::-1]
+        ordered = rows[np.argsort(self.rank(column)[rows])]
+        return ordered if ascending else ordered[::-1]
+
+    @staticmethod
+    def page(rows, number, size):
+        """Rows of 1-based page `number`, plus the page count."""
+        pages = max(1, -(-len(rows) // size))
+        number = min(max(number, 1), pages)
+        return rows[(number - 1) * size:number * size], pages
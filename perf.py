@@ -0,0 +1,171 @@
+"""Lightweight hot-path instrumentation: stage timers, counters and a metrics endpoint.
+
+Disabled unless TRACKER_METRICS=1. When disabled, `timer()` hands back one shared
+no-op context manager and `count()` returns immediately, so instrumented code
+pays a function call and an attribute check.
+"""
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('tracker.metrics')
+
+_NOOP = nullcontext()
+_IMPORTED_AT = time.time()
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.record(self.name, time.perf_counter() - self.start)
+
+
+class Metrics:
+    """Process-wide timers (count/total/min/max/last seconds) and counters."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+            self.started_at = time.time()
+
+    def timer(self, name):
+        return _Timer(self, name) if self.enabled else _NOOP
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            stat = self.timers.get(name)
+            if stat is None:
+                self.timers[name] = {'count': 1, 'total': seconds, 'min': seconds, 'max': seconds, 'last': seconds}
+            else:
+                stat['count'] += 1
+                stat['total'] += seconds
+                stat['min'] = min(stat['min'], seconds)
+                stat['max'] = max(stat['max'], seconds)
+                stat['last'] = seconds
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({'metric': name, 'seconds': round(seconds, 6)}))
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'since': self.started_at,
+                'timers': {name: dict(stat) for name, stat in self.timers.items()},
+                'counters': dict(self.counters),
+            }
+
+    def prometheus(self):
+        """The current values in Prometheus text exposition format."""
+        data = self.snapshot()
+        lines = []
+        for name, stat in sorted(data['timers'].items()):
+            metric = _metric_name(name)
+            lines.append(f"tracker_{metric}_seconds_count {stat['count']}")
+            lines.append(f"tracker_{metric}_seconds_sum {stat['total']:.6f}")
+            lines.append(f"tracker_{metric}_seconds_max {stat['max']:.6f}")
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"tracker_{_metric_name(name)}_total {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return ''.join(ch if ch.isalnum() else '_' for ch in name)
+
+
+METRICS = Metrics(enabled=os.environ.get("TRACKER_METRICS", "0") == "1")
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Keeps heavy dependencies that only some pages or the background refresh
+    need out of a replica's cold start. The import is timed as `import.<name>`.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    fresh = self._name not in sys.modules
+                    start = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    if fresh:
+                        METRICS.record(f'import.{self._name}', time.perf_counter() - start)
+                module = self._module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name!r}{'' if self._module is None else ' (loaded)'}>"
+
+
+def process_started_at():
+    """Wall-clock time this process started; where /proc is missing, when perf was first imported."""
+    try:
+        with open('/proc/self/stat') as f:
+            # starttime, in clock ticks since boot, is field 22; the command name before ')' may contain spaces
+            ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return _IMPORTED_AT
+
+
+def serve_metrics(port, host='127.0.0.1', metrics=METRICS):
+    """Serve /metrics (Prometheus text) and /metrics.json on a daemon thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, kind = metrics.prometheus().encode(), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, kind = json.dumps(metrics.snapshot()).encode(), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', kind)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
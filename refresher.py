@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+
+from loader import load_workbook
+from perf import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One cleaned workbook version. Shared by every session, so treat it as read-only."""
+    tracker: object
+    summary: object
+    content_hash: str
+    loaded_at: float
+    checked_at: float
+    error: str | None = None
+    stats: dict | None = None
+    # Tables the loader already derived for this version (e.g. 'weekly_long')
+    derived: dict | None = None
+
+    @property
+    def age(self):
+        # Seconds since the source was last reached successfully
+        return time.time() - self.checked_at
+
+
+class SnapshotRefresher:
+    """Fetches and cleans the workbook on a background thread.
+
+    Readers call `current()`, which only returns the latest snapshot reference;
+    the refresh thread builds a new snapshot off to the side and swaps it in.
+    When a refresh fails the last good snapshot stays in place with `error` set.
+    With a `store`, the newest persisted snapshot is served until the first
+    refresh completes (which re-parses it even if unchanged, to rebuild its
+    stats), and every newly parsed snapshot is written back to it.
+    With a `history`, every newly parsed snapshot is also appended to it.
+    """
+
+    def __init__(self, fetcher, interval=60, loader=load_workbook, store=None, history=None):
+        self.fetcher = fetcher
+        self.interval = interval
+        self.loader = loader
+        self.store = store
+        self.history = history
+        self._snapshot = None
+        self._last_error = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            if self.store is not None and self._snapshot is None:
+                self._snapshot = self.store.load_latest()
+                if self._snapshot is not None:
+                    self._ready.set()
+            self._thread = threading.Thread(target=self._run, name='workbook-refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def refresh_now(self):
+        self._wake.set()
+
+    def current(self, timeout=None):
+        """Latest snapshot; blocks up to `timeout` only until the first load finishes."""
+        if self._snapshot is None:
+            self._ready.wait(timeout)
+        return self._snapshot
+
+    @property
+    def last_error(self):
+        return self._last_error
+
+    def refresh(self):
+        try:
+            with METRICS.timer('refresh.total'):
+                self._refresh()
+            METRICS.count('refresh.ok')
+            self._last_error = None
+        except Exception as e:
+            METRICS.count('refresh.failed')
+            logger.warning("Workbook refresh failed: %s", e)
+            self._last_error = str(e)
+            if self._snapshot is not None:
+                self._snapshot = replace(self._snapshot, error=self._last_error)
+        finally:
+            self._ready.set()
+        return self._snapshot
+
+    def _refresh(self):
+        result = self.fetcher.fetch(force=True)
+        previous = self._snapshot
+        # A warm-started snapshot has no stats or derived tables; its first refresh loads it again to rebuild them
+        if previous is not None and previous.content_hash == result.content_hash and previous.stats is not None:
+            self._snapshot = replace(previous, checked_at=result.checked_at, error=None)
+        else:
+            tracker, summary, stats = self.loader(result.content)
+            derived = stats.pop('derived', None)
+            self._snapshot = Snapshot(tracker, summary, result.content_hash, loaded_at=result.checked_at,
+                                      checked_at=result.checked_at, stats=stats, derived=derived)
+            self._persist(self._snapshot)
+            self._record(self._snapshot)
+
+    def _persist(self, snapshot):
+        if self.store is None:
+            return
+        try:
+            self.store.save(snapshot)
+        except Exception as e:
+            logger.warning("Could not persist snapshot %s: %s", snapshot.content_hash[:12], e)
+
+    def _record(self, snapshot):
+        if self.history is None:
+            return
+        try:
+            with METRICS.timer('history.append'):
+                self.history.append(snapshot)
+        except Exception as e:
+            logger.warning("Could not record snapshot %s in history: %s", snapshot.content_hash[:12], e)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import time
+
+import pyarrow as pa
+
+from refresher import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the cleaned tracker/summary layout produced by loader.py changes;
+# snapshots written under another version are ignored and rebuilt from the workbook.
+SCHEMA_VERSION = 4
+POINTER_FILE = 'latest.json'
+POINTER_KEYS = {'schema_version', 'content_hash', 'loaded_at', 'checked_at'}
+
+
+class SnapshotStore:
+    """Persists cleaned snapshots as uncompressed Arrow IPC files keyed by content hash.
+
+    Arrow IPC (rather than Parquet) so a warm start is a memory map of the file
+    instead of a decode. `latest.json` points at the newest snapshot and records
+    the schema version it was written with.
+    """
+
+    def __init__(self, directory, keep=2):
+        self.directory = directory
+        self.keep = keep
+
+    def _path(self, content_hash, name):
+        return os.path.join(self.directory, f"{content_hash}.{name}.arrow")
+
+    def save(self, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        for name, frame in (('tracker', snapshot.tracker), ('summary', snapshot.summary)):
+            table = to_arrow(frame)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b'schema_version': str(SCHEMA_VERSION).encode(),
+                b'content_hash': snapshot.content_hash.encode(),
+            })
+            _atomic_write(self._path(snapshot.content_hash, name), lambda f: _write_ipc(f, table))
+
+        pointer = {
+            'schema_version': SCHEMA_VERSION,
+            'content_hash': snapshot.content_hash,
+            'loaded_at': snapshot.loaded_at,
+            'checked_at': snapshot.checked_at,
+        }
+        _atomic_write(os.path.join(self.directory, POINTER_FILE),
+                      lambda f: f.write(json.dumps(pointer).encode()))
+        self._prune()
+
+    def load_latest(self):
+        """The newest persisted snapshot, or None when missing, stale or unreadable."""
+        pointer_path = os.path.join(self.directory, POINTER_FILE)
+        try:
+            with open(pointer_path) as f:
+                pointer = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(pointer, dict) or not POINTER_KEYS <= pointer.keys():
+            logger.warning("Ignoring malformed snapshot pointer %s", pointer_path)
+            return None
+
+        if pointer['schema_version'] != SCHEMA_VERSION:
+            logger.info("Ignoring snapshot written with schema version %s (current %s)",
+                        pointer['schema_version'], SCHEMA_VERSION)
+            return None
+
+        content_hash = pointer['content_hash']
+        try:
+            start = time.perf_counter()
+            tracker = _read_ipc(self._path(content_hash, 'tracker'))
+            summary = _read_ipc(self._path(content_hash, 'summary'))
+        except (OSError, pa.ArrowException) as e:
+            logger.warning("Could not read snapshot %s: %s", content_hash, e)
+            return None
+        logger.info("Mapped snapshot %s in %.3fs", content_hash[:12], time.perf_counter() - start)
+        return Snapshot(tracker, summary, content_hash,
+                        loaded_at=pointer['loaded_at'], checked_at=pointer['checked_at'])
+
+    def _prune(self):
+        trackers = [f for f in os.listdir(self.directory) if f.endswith('.tracker.arrow')]
+        trackers.sort(key=lambda f: os.path.getmtime(os.path.join(self.directory, f)), reverse=True)
+        for stale in trackers[self.keep:]:
+            content_hash = stale.split('.')[0]
+            for name in ('tracker', 'summary'):
+                try:
+                    os.remove(self._path(content_hash, name))
+                except OSError:
+                    pass
+
+
+def to_arrow(frame):
+    """Arrow table of `frame` without its index."""
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns (e.g. a date typed as text in one row) are stored as strings
+        frame = frame.copy()
+        for col in frame.columns[frame.dtypes == object]:
+            frame[col] = frame[col].where(frame[col].isna(), frame[col].astype(str))
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def _write_ipc(f, table):
+    with pa.ipc.new_file(f, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_ipc(path):
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def _atomic_write(path, write):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
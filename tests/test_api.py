@@ -0,0 +1,109 @@
+import gzip
+import json
+from functools import partial
+
+import pyarrow as pa
+import pytest
+
+from api import ARROW_MIME, TrackerAPI
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import make_workbook
+from courses import Course
+from fetcher import WorkbookFetcher
+from loader import load_workbook
+from refresher import SnapshotRefresher
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['full', 'compact'])
+def api(request):
+    content = make_workbook(colleges=40, batches=3, weeks=3)
+    with StubServer(content) as stub:
+        loaded = SnapshotRefresher(WorkbookFetcher(stub.url), loader=partial(load_workbook, compact=request.param))
+        loaded.refresh()
+        # Never refreshed, so it has no snapshot to serve yet
+        pending = SnapshotRefresher(WorkbookFetcher(stub.url))
+        courses = [Course('dav', 'Data Analytics', stub.url), Course('cloud', 'Cloud Computing', stub.url)]
+        yield TrackerAPI({'dav': loaded, 'cloud': pending}, courses)
+
+
+def get(api, target, **headers):
+    return api.handle(target, headers)
+
+
+def records(response):
+    assert response.status == 200, response.body
+    return json.loads(response.body)
+
+
+def test_lists_courses(api):
+    courses = {course['key']: course for course in records(get(api, '/api/courses'))}
+    assert courses['dav']['rows'] == 120 and courses['dav']['content_hash']
+    assert courses['cloud']['content_hash'] is None
+
+
+def test_etag_answers_304_until_the_request_changes(api):
+    first = get(api, '/api/courses/dav/kpis')
+    etag = first.headers['ETag']
+    again = get(api, '/api/courses/dav/kpis', **{'If-None-Match': etag})
+    assert again.status == 304 and again.body == b'' and again.headers['ETag'] == etag
+    other = get(api, '/api/courses/dav/kpis?top=5', **{'If-None-Match': etag})
+    assert other.status == 200 and other.headers['ETag'] != etag
+
+
+def test_gzips_large_bodies(api):
+    plain = get(api, '/api/courses/dav/rows')
+    zipped = get(api, '/api/courses/dav/rows', **{'Accept-Encoding': 'gzip, deflate'})
+    assert 'Content-Encoding' not in plain.headers
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.body) == plain.body
+    small = get(api, '/api/courses/dav/kpis', **{'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+@pytest.mark.parametrize('target, headers', [
+    ('/api/courses/dav/weekly?format=arrow', {}),
+    ('/api/courses/dav/weekly', {'Accept': ARROW_MIME}),
+])
+def test_arrow_matches_json(api, target, headers):
+    response = api.handle(target, headers)
+    assert response.status == 200 and response.headers['Content-Type'] == ARROW_MIME
+    table = pa.ipc.open_stream(response.body).read_all()
+    assert table.schema.metadata[b'content_hash'].decode() == response.headers['X-Content-Hash']
+    expected = records(get(api, '/api/courses/dav/weekly'))
+    assert table.num_rows == len(expected)
+    assert table.column('Intervention Count').to_pylist() == [row['Intervention Count'] for row in expected]
+
+
+def test_filters(api):
+    rows = records(get(api, '/api/courses/dav/rows?columns=College Name,Batch No'))
+    college = rows[0]['College Name']
+    chosen = records(get(api, f'/api/courses/dav/rows?college={college}&batch=1&batch=2'))
+    assert chosen and all(row['College Name'] == college and row['Batch No'] in (1, 2) for row in chosen)
+    assert len(chosen) == len([row for row in rows if row['College Name'] == college and row['Batch No'] in (1, 2)])
+
+    kpis = records(get(api, f'/api/courses/dav/kpis?college={college}&batch=1'))[0]
+    assert kpis['Batches'] == 1
+    assert records(get(api, '/api/courses/dav/kpis?college=No Such College'))[0]['Batches'] == 0
+
+
+def test_batch_accepts_either_spelling(api):
+    first = records(get(api, '/api/courses/dav/rows?batch=1'))
+    assert first and all(row['Batch No'] == 1 for row in first)
+    assert records(get(api, '/api/courses/dav/rows?batch=1.0')) == first
+
+
+@pytest.mark.parametrize('target, status', [
+    ('/api/courses/dav/rows?columns=Nope', 400),
+    ('/api/courses/dav/rows?limit=-1', 400),
+    ('/api/courses/dav/colleges?top=ten', 400),
+    ('/api/courses/dav/kpis?format=xml', 400),
+    ('/api/courses/nope/kpis', 404),
+    ('/api/courses/dav/nope', 404),
+    ('/api/elsewhere', 404),
+    ('/api/courses/cloud/kpis', 503),
+])
+def test_errors(api, target, status):
+    response = get(api, target)
+    assert response.status == status
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert json.loads(response.body)['error']
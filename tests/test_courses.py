@@ -0,0 +1,33 @@
+import time
+
+from benchmarks.synthetic import make_workbook
+from courses import parse_pool, pooled_reader
+from loader import read_workbook
+
+
+def test_pooled_reader_matches_read_workbook():
+    content = make_workbook(colleges=4, batches=2, weeks=2)
+    pool = parse_pool(1)
+    try:
+        tracker, summary, _timings = pooled_reader(pool)(content)
+    finally:
+        pool.shutdown()
+    expected_tracker, expected_summary, _timings = read_workbook(content)
+    assert tracker.equals(expected_tracker) and summary.equals(expected_summary)
+
+
+def test_stuck_pool_falls_back_to_parsing_in_thread():
+    content = make_workbook(colleges=4, batches=2, weeks=2)
+    pool = parse_pool(1)
+    try:
+        # Occupies the only worker, as a wedged parse would
+        pool.submit(time.sleep, 5)
+        read = pooled_reader(pool, timeout=0.5)
+        start = time.perf_counter()
+        tracker, _summary, _timings = read(content)
+        assert len(tracker) == len(read_workbook(content)[0])
+        # Later parses skip the stuck pool instead of waiting out the timeout again
+        read(content)
+        assert time.perf_counter() - start < 4
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from benchmarks.stub_server import StubServer
+from fetcher import PayloadTooLarge, WorkbookFetcher
+
+BODY = b'x' * 300_000
+
+
+def test_retries_through_503s():
+    with StubServer(BODY, fail_times=2) as stub:
+        result = WorkbookFetcher(stub.url, backoff=0.01).fetch()
+        assert stub.requests == 3
+        assert result.content == BODY and result.changed
+
+
+def test_revalidates_with_304():
+    with StubServer(BODY) as stub:
+        fetcher = WorkbookFetcher(stub.url)
+        first = fetcher.fetch()
+        again = fetcher.fetch(force=True)
+        assert stub.not_modified == 1
+        assert not again.changed and again.content_hash == first.content_hash and again.content == BODY
+
+
+def test_gives_up_after_retries():
+    with StubServer(BODY, fail_times=10) as stub:
+        with pytest.raises(requests.HTTPError) as error:
+            WorkbookFetcher(stub.url, retries=2, backoff=0.01).fetch()
+        assert error.value.response.status_code == 503
+        assert stub.requests == 3
+
+
+def test_read_timeout_is_retried_then_raised():
+    with StubServer(BODY, delay=0.5) as stub:
+        with pytest.raises(requests.Timeout):
+            WorkbookFetcher(stub.url, timeout=(1, 0.1), retries=1, backoff=0.01).fetch()
+        assert stub.requests == 2
+
+
+def test_concurrent_callers_share_one_download():
+    with StubServer(BODY, delay=0.3) as stub:
+        fetcher = WorkbookFetcher(stub.url)
+        start = threading.Barrier(8)
+        results = []
+
+        def fetch():
+            start.wait()
+            results.append(fetcher.fetch(force=True))
+
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert stub.requests == 1
+        assert len(results) == 8 and len({id(result) for result in results}) == 1
+
+
+def test_refuses_oversized_body():
+    with StubServer(BODY) as stub:
+        with pytest.raises(PayloadTooLarge):
+            WorkbookFetcher(stub.url, max_bytes=100_000).fetch()
+
+
+def test_trickling_body_hits_the_deadline():
+    # Each 1 KiB arrives well within the read timeout, so only the overall deadline stops it
+    with StubServer(BODY, trickle=0.01) as stub:
+        started = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            WorkbookFetcher(stub.url, retries=1, backoff=0.01, deadline=0.3).fetch()
+        assert time.monotonic() - started < 3
+        assert stub.requests == 2
+
+
+def test_waiting_caller_gives_up_with_the_leader():
+    with StubServer(BODY, trickle=0.01) as stub:
+        fetcher = WorkbookFetcher(stub.url, retries=0, deadline=0.3)
+        leader = threading.Thread(target=lambda: pytest.raises(requests.Timeout, fetcher.fetch))
+        leader.start()
+        time.sleep(0.1)
+        fetcher._wait_limit = lambda: 0.05
+        with pytest.raises(requests.Timeout, match='waiting'):
+            fetcher.fetch()
+        leader.join()
@@ -0,0 +1,19 @@
+import warnings
+
+from benchmarks.synthetic import make_workbook
+from history import HistoryStore
+from loader import load_workbook
+from refresher import Snapshot
+
+
+def test_trend_with_only_open_ranges(tmp_path):
+    history = HistoryStore(str(tmp_path / 'history.sqlite'))
+    tracker, summary, _stats = load_workbook(make_workbook(colleges=5, batches=2, weeks=2), compact=True)
+    history.append(Snapshot(tracker, summary, 'v1', loaded_at=1.7e9, checked_at=1.7e9))
+    college = tracker['College Name'].iloc[0]
+    with warnings.catch_warnings():
+        # Every range is still open, so valid_to reads back as None throughout
+        warnings.simplefilter('error')
+        trend = history.trend('college', college)
+    assert len(trend) == 1
+    assert trend['Students Count'].iloc[0] == tracker.loc[tracker['College Name'] == college, 'Students Count'].sum()
@@ -0,0 +1,119 @@
+import io
+import random
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from analytics import build_weekly_long
+from benchmarks.synthetic import make_workbook
+from incremental import IncrementalLoader
+from loader import TRACKER_HEADER_ROW, TRACKER_SHEET, load_workbook
+
+BATCHES = 6
+FIRST_ROW = TRACKER_HEADER_ROW + 2
+
+
+def college_row(college, batch=0):
+    """Sheet row of a college's batch in a fresh make_workbook(batches=BATCHES) sheet."""
+    return FIRST_ROW + BATCHES * college + batch
+
+
+def columns(ws):
+    return {cell.value: cell.column for cell in ws[TRACKER_HEADER_ROW + 1]}
+
+
+def weekday_edits(ws):
+    rnd = random.Random(1)
+    for _ in range(5):
+        cell = ws.cell(rnd.randint(FIRST_ROW, ws.max_row - 1), rnd.randint(10, 40))
+        cell.value = None if cell.value else 1
+
+
+def structural_edits(ws):
+    # A blank University Code on a college's first row inherits the previous college's
+    ws.cell(college_row(10), columns(ws)['University Code']).value = None
+    ws.cell(college_row(20), columns(ws)['College Name']).value = 'Renamed College'
+
+
+def delete_college(ws):
+    ws.delete_rows(college_row(30), BATCHES)
+
+
+def insert_college(ws):
+    col = columns(ws)
+    ws.insert_rows(college_row(40), 2)
+    ws.cell(college_row(40), col['College Name']).value = 'New College'
+    ws.cell(college_row(40), col['Batch No']).value = 1
+    ws.cell(college_row(40, 1), col['Batch No']).value = 2
+    ws.cell(college_row(40), col['Monday']).value = 1
+
+
+def bad_rows(ws):
+    col = columns(ws)
+    ws.cell(college_row(50), col['Students Count']).value = 'forty'
+    ws.cell(college_row(60, 2), col['Intervention Completed']).value = -1
+    ws.cell(college_row(70), col['Monday']).value = 2
+    ws.cell(college_row(80, 1), col['Batch No']).value = 1
+
+
+def fix_bad_row(ws):
+    ws.cell(college_row(50), columns(ws)['Students Count']).value = 40
+
+
+def weekday_edit_beside_flags(ws):
+    # Re-cleans one college while the flagged rows of other colleges are carried over
+    cell = ws.cell(college_row(5), columns(ws)['Tuesday'])
+    cell.value = None if cell.value else 1
+
+
+# None reloads the same workbook, exercising the unchanged-content shortcut
+STEPS = [None, weekday_edits, structural_edits, delete_college, insert_college, None, bad_rows, None, fix_bad_row,
+         weekday_edit_beside_flags]
+
+
+def edited(content, edit):
+    wb = openpyxl.load_workbook(io.BytesIO(content))
+    edit(wb[TRACKER_SHEET])
+    sink = io.BytesIO()
+    wb.save(sink)
+    return sink.getvalue()
+
+
+def assert_same_tracker(expected, got):
+    assert list(got.columns) == list(expected.columns)
+    for col in expected.columns:
+        want, have = expected[col], got[col]
+        if isinstance(want.dtype, pd.CategoricalDtype):
+            assert isinstance(have.dtype, pd.CategoricalDtype), col
+            assert list(have.cat.categories) == list(want.cat.categories), col
+            assert list(have.astype(object)) == list(want.astype(object)), col
+        else:
+            pd.testing.assert_series_equal(have.reset_index(drop=True), want.reset_index(drop=True), check_names=False)
+
+
+def assert_same_weekly(expected, got):
+    labels = {'College Name': object, 'Week_Label': object}
+    pd.testing.assert_frame_equal(got.astype(labels).reset_index(drop=True),
+                                  expected.astype(labels).reset_index(drop=True), check_dtype=False)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_incremental_loads_match_full_loads(compact):
+    loader = IncrementalLoader(compact=compact)
+    content = make_workbook(colleges=90, batches=BATCHES, weeks=6)
+    for step in STEPS:
+        if step is not None:
+            content = edited(content, step)
+        tracker, summary, stats = load_workbook(content, compact=compact)
+        got_tracker, got_summary, got_stats = loader(content)
+
+        assert_same_tracker(tracker, got_tracker)
+        pd.testing.assert_frame_equal(got_summary, summary)
+        assert_same_weekly(build_weekly_long(tracker), got_stats['derived']['weekly_long'])
+        assert got_stats['quality'] == stats['quality']
+        pd.testing.assert_frame_equal(got_stats['derived']['quarantine'].astype(str),
+                                      stats['derived']['quarantine'].astype(str))
+        if step in (weekday_edits, weekday_edit_beside_flags):
+            # Only the edited colleges are cleaned again
+            assert got_stats['blocks']['reused'] > 0
@@ -0,0 +1,79 @@
+import io
+
+import openpyxl
+import pandas as pd
+
+from benchmarks.synthetic import make_workbook
+from filters import FilterEngine
+from loader import TRACKER_HEADER_ROW, TRACKER_SHEET, load_workbook, read_workbook
+
+TRACKER_HEADER = ['Sl. No', 'University Code', 'College Name', 'Students Count', 'Trainer name', 'Batch No',
+                  'Monday', 'Tuesday', 'Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch',
+                  'Intervention Completed', 'Pending Intervention ', 'Completion Percentage']
+
+
+def awkward_workbook():
+    """A small tracker holding formula errors, pandas' NA strings, blank rows and trailing blanks."""
+    wb = openpyxl.Workbook()
+    tracker = wb.active
+    tracker.title = TRACKER_SHEET
+    for _ in range(TRACKER_HEADER_ROW):
+        tracker.append(['Academic Session Tracker'])
+    tracker.append(TRACKER_HEADER)
+    rows = [
+        [1, 'unm1001', 'College A', 30, 'Trainer 1', 1, 1, None, 10, 35, 4, 14, 4 / 18],
+        [None, None, None, 25, 'N/A', 2, None, 1, 0, 0, 0, 0, '#DIV/0!'],
+        [2, 'unm1002', 'NA', 40, 'null', 1, '#N/A', 1, 22.5, 22.5, 9, 9, 0.5],
+        [None, None, None, None, None, None, None, None, None, None, None, None, None],
+        [3, 'unm1003', 'College C', 'n/a', 'Trainer 3', 1, 1.0, 1, '#NUM!', 45, '#VALUE!', 18, '#REF!'],
+        [None, None, 'Grand Total'],
+        [None, None, None],
+    ]
+    for row in rows:
+        tracker.append(row)
+    summary = wb.create_sheet('Summary')
+    summary.append(['Category', 'Enrolled Count', 'Completed Count', 'In Progress', 'Not Started'])
+    summary.append(['Total Count', 95, 0, 'NULL', 26])
+    sink = io.BytesIO()
+    wb.save(sink)
+    return sink.getvalue()
+
+
+def assert_matches_read_excel(content):
+    tracker, summary, _timings = read_workbook(content)
+    expected_tracker = pd.read_excel(io.BytesIO(content), sheet_name=TRACKER_SHEET, skiprows=TRACKER_HEADER_ROW)
+    expected_summary = pd.read_excel(io.BytesIO(content), sheet_name='Summary')
+    pd.testing.assert_frame_equal(tracker, expected_tracker)
+    pd.testing.assert_frame_equal(summary, expected_summary)
+
+
+def test_read_workbook_matches_read_excel():
+    assert_matches_read_excel(make_workbook(colleges=6, batches=3, weeks=2))
+
+
+def test_error_and_na_cells_read_as_nan():
+    content = awkward_workbook()
+    assert_matches_read_excel(content)
+    tracker, _summary, _timings = read_workbook(content)
+    assert tracker['Completion Percentage'].isna().tolist() == [False, True, False, True, True, True]
+    assert tracker['Trainer name'].isna().tolist()[:3] == [False, True, True]
+
+
+def test_div0_completion_is_not_quarantined():
+    tracker, _summary, stats = load_workbook(awkward_workbook())
+    checks = stats['quality']['checks']
+    # The '#DIV/0!' completion, 'n/a' count and '#VALUE!' count are blanks, not text read as 0
+    assert checks['non_numeric'] == 0
+    # 'N/A' names are blanks, forward-filled from the row above like any other blank
+    assert tracker['Trainer name'].tolist()[:2] == ['Trainer 1', 'Trainer 1']
+
+
+def test_compact_keeps_batch_numbers_exact():
+    wb = openpyxl.load_workbook(io.BytesIO(make_workbook(colleges=2, batches=2, weeks=1)))
+    ws = wb[TRACKER_SHEET]
+    header = {cell.value: cell.column for cell in ws[TRACKER_HEADER_ROW + 1]}
+    ws.cell(TRACKER_HEADER_ROW + 3, header['Batch No']).value = 1.1
+    sink = io.BytesIO()
+    wb.save(sink)
+    tracker, _summary, _stats = load_workbook(sink.getvalue(), compact=True)
+    assert 1.1 in FilterEngine(tracker).options('Batch No', {})
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from analytics import AggregateCube, SUM_COLS, build_weekly_long, weekly_interventions
+from benchmarks.bench import legacy_filter, legacy_weekly, random_selections
+from benchmarks.synthetic import make_workbook
+from filters import FILTER_COLS, FilterEngine
+from loader import load_workbook
+
+
+@pytest.fixture(scope='module')
+def content():
+    return make_workbook(colleges=60, batches=4, weeks=4)
+
+
+@pytest.fixture(scope='module')
+def full(content):
+    return load_workbook(content)[0]
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['full', 'compact'])
+def tracker(request, content):
+    return load_workbook(content, compact=request.param)[0]
+
+
+@pytest.fixture(scope='module')
+def states(tracker):
+    # No selection, then random cascades including ones that empty the view
+    return [{}] + random_selections(FilterEngine(tracker), 40) + [{FILTER_COLS[0]: ['No Such University']}]
+
+
+def selected(tracker, rows):
+    return tracker if rows is None else tracker.iloc[rows]
+
+
+def test_filter_engine_matches_legacy_filter(tracker, full, states):
+    engine = FilterEngine(tracker)
+    for selections in states:
+        expected, expected_options = legacy_filter(full, selections)
+        rows, options = engine.apply(selections)
+        assert list(selected(tracker, rows).index) == list(expected.index)
+        assert options == {col: list(values) for col, values in expected_options.items()}
+
+
+def test_aggregate_cube_matches_filtered_sums(tracker, full, states):
+    cube = AggregateCube(tracker)
+    for selections in states:
+        expected, _ = legacy_filter(full, selections)
+        totals = cube.totals(selections)
+        for col in SUM_COLS:
+            assert totals[col] == pytest.approx(expected[col].sum()), col
+        completion = expected['Completion Percentage'].mean()
+        assert totals['Completion %'] == (0 if pd.isna(completion) else round(completion * 100))
+
+        status = (expected.groupby('College Name')[['Intervention Completed', 'Pending Intervention ']]
+                  .sum().assign(Total=lambda d: d['Intervention Completed'] + d['Pending Intervention ']))
+        got = cube.college_status(selections, top=len(status))
+        assert dict(zip(got['College Name'].astype(str), got['Total'])) == pytest.approx(status['Total'].to_dict())
+        # Colleges tied at the cut-off may come out in either order, so compare the top totals only
+        top = cube.college_status(selections)['Total'].tolist()
+        assert top == pytest.approx(status['Total'].sort_values(ascending=False).head(10).tolist())
+
+
+def test_weekly_interventions_match_legacy_melt(tracker, full, states):
+    engine = FilterEngine(tracker)
+    weekly_long = build_weekly_long(tracker)
+    keys = ['College Name', 'Batch No', 'Week']
+    for selections in states:
+        expected, _ = legacy_filter(full, selections)
+        want = legacy_weekly(expected).sort_values(keys).reset_index(drop=True)
+        got = weekly_interventions(weekly_long, engine.rows(selections)).sort_values(keys).reset_index(drop=True)
+        labels = {'College Name': object, 'Week_Label': object, 'Batch No': float, 'Week': int,
+                  'Intervention Count': int}
+        pd.testing.assert_frame_equal(got.astype(labels), want.astype(labels))
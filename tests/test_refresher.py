@@ -0,0 +1,55 @@
+import io
+
+import openpyxl
+import pytest
+
+from benchmarks.stub_server import StubServer
+from benchmarks.synthetic import make_workbook
+from fetcher import WorkbookFetcher
+from loader import TRACKER_HEADER_ROW, TRACKER_SHEET
+from refresher import SnapshotRefresher
+from snapshot_store import SnapshotStore
+
+
+def without_columns(content, names):
+    wb = openpyxl.load_workbook(io.BytesIO(content))
+    ws = wb[TRACKER_SHEET]
+    header = {cell.value: cell.column for cell in ws[TRACKER_HEADER_ROW + 1]}
+    for column in sorted((header[name] for name in names), reverse=True):
+        ws.delete_cols(column)
+    sink = io.BytesIO()
+    wb.save(sink)
+    return sink.getvalue()
+
+
+@pytest.mark.parametrize('missing', [
+    ['Batch Wise Weekly Hours Completed', 'Pending Hours Per Batch'],
+    ['Pending Intervention '],
+])
+def test_bad_layout_keeps_previous_snapshot(missing):
+    content = make_workbook(colleges=5, batches=2, weeks=2)
+    with StubServer(content) as stub:
+        refresher = SnapshotRefresher(WorkbookFetcher(stub.url))
+        good = refresher.refresh()
+        assert good.error is None
+
+        stub.set_content(without_columns(content, missing))
+        served = refresher.refresh()
+        assert served.content_hash == good.content_hash
+        assert served.tracker is good.tracker
+        assert 'missing required columns' in served.error
+
+
+def test_warm_start_rebuilds_stats(tmp_path):
+    content = make_workbook(colleges=5, batches=2, weeks=2)
+    store = SnapshotStore(str(tmp_path))
+    with StubServer(content) as stub:
+        first = SnapshotRefresher(WorkbookFetcher(stub.url), store=store).refresh()
+
+        restarted = SnapshotRefresher(WorkbookFetcher(stub.url), store=store)
+        restarted._snapshot = store.load_latest()
+        assert restarted.current().stats is None
+        served = restarted.refresh()
+    assert served.content_hash == first.content_hash
+    assert served.stats['quality'] == first.stats['quality']
+    assert served.derived.keys() == first.derived.keys()
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import snapshot_store
+from benchmarks.synthetic import make_workbook
+from loader import load_workbook
+from refresher import Snapshot
+from snapshot_store import POINTER_FILE, SnapshotStore
+
+
+@pytest.fixture(scope='module')
+def snapshot():
+    tracker, summary, _stats = load_workbook(make_workbook(colleges=20, batches=3, weeks=3), compact=True)
+    return Snapshot(tracker, summary, 'a' * 64, loaded_at=100.0, checked_at=200.0)
+
+
+def test_round_trip_keeps_compact_dtypes(tmp_path, snapshot):
+    store = SnapshotStore(str(tmp_path))
+    store.save(snapshot)
+    loaded = store.load_latest()
+
+    assert loaded.content_hash == snapshot.content_hash
+    assert (loaded.loaded_at, loaded.checked_at) == (100.0, 200.0)
+    assert any(isinstance(dtype, pd.CategoricalDtype) for dtype in snapshot.tracker.dtypes)
+    pd.testing.assert_frame_equal(loaded.tracker, snapshot.tracker)
+    pd.testing.assert_frame_equal(loaded.summary, snapshot.summary)
+
+
+def test_keeps_the_newest_snapshots(tmp_path, snapshot):
+    store = SnapshotStore(str(tmp_path), keep=2)
+    for n, content_hash in enumerate('abc'):
+        store.save(Snapshot(snapshot.tracker, snapshot.summary, content_hash * 64, loaded_at=n, checked_at=n))
+        # Pruning orders by modification time
+        os.utime(store._path(content_hash * 64, 'tracker'), (n, n))
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [POINTER_FILE] + [f"{h * 64}.{name}.arrow" for h in 'bc' for name in ('tracker', 'summary')])
+    assert store.load_latest().content_hash == 'c' * 64
+
+
+def test_ignores_a_stale_schema_version(tmp_path, snapshot, monkeypatch):
+    store = SnapshotStore(str(tmp_path))
+    monkeypatch.setattr(snapshot_store, 'SCHEMA_VERSION', snapshot_store.SCHEMA_VERSION - 1)
+    store.save(snapshot)
+    monkeypatch.undo()
+    assert store.load_latest() is None
+
+
+def test_missing_or_unreadable_files_load_nothing(tmp_path, snapshot):
+    store = SnapshotStore(str(tmp_path))
+    assert store.load_latest() is None
+
+    store.save(snapshot)
+    with open(store._path(snapshot.content_hash, 'tracker'), 'wb') as f:
+        f.write(b'not an arrow file')
+    assert store.load_latest() is None
+
+    store.save(snapshot)
+    os.remove(store._path(snapshot.content_hash, 'summary'))
+    assert store.load_latest() is None
+
+    with open(tmp_path / POINTER_FILE, 'w') as f:
+        f.write('{"schema_version": ')
+    assert store.load_latest() is None
+    with open(tmp_path / POINTER_FILE, 'w') as f:
+        json.dump({'schema_version': snapshot_store.SCHEMA_VERSION}, f)
+    assert store.load_latest() is None
+    with open(tmp_path / POINTER_FILE, 'w') as f:
+        json.dump([snapshot.content_hash], f)
+    assert store.load_latest() is None